@@ -12,6 +12,9 @@ setup(
         "rich>=13.7.0",
         "python-dotenv>=1.0.0",
     ],
+    extras_require={
+        "speedups": ["orjson>=3.9.0", "xxhash>=3.0.0", "msgpack>=1.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "testtool = testTool.main:main"
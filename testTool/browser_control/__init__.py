@@ -1,5 +1,6 @@
 """Browser control layer initialization."""
 
 from .playwright_controller import PlaywrightController
+from .browser_pool import BrowserPool, get_browser_pool
 
-__all__ = ["PlaywrightController"]
+__all__ = ["PlaywrightController", "BrowserPool", "get_browser_pool"]
@@ -0,0 +1,107 @@
+"""Shared Playwright browser pool."""
+
+import asyncio
+import atexit
+from typing import Optional, Dict, Any, Tuple
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+
+class BrowserPool:
+    """
+    Keeps one Playwright driver and one browser per (type, headless) pair alive
+    and hands out a fresh BrowserContext to each caller.
+    
+    Contexts are fully isolated (cookies, storage, cache) but take milliseconds
+    to create, whereas a browser launch costs 0.5-2s. Playwright objects are
+    bound to the event loop that created them, so the pool starts over when it
+    is used from a different loop.
+    """
+    
+    def __init__(self):
+        """Initialize an empty pool; browsers are launched on first use."""
+        self._playwright: Optional[Playwright] = None
+        self._browsers: Dict[Tuple[str, bool], Browser] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def get_browser(self, browser_type: str = "chromium", headless: bool = True) -> Browser:
+        """
+        Get the shared browser, launching it if needed.
+        
+        Args:
+            browser_type: Browser type (chromium, firefox, webkit)
+            headless: Whether to run in headless mode
+        
+        Returns:
+            A connected Browser instance
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._playwright = None
+            self._browsers = {}
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            key = (browser_type, headless)
+            browser = self._browsers.get(key)
+            
+            if browser is None or not browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                browser_launcher = getattr(self._playwright, browser_type)
+                browser = await browser_launcher.launch(headless=headless)
+                self._browsers[key] = browser
+            
+            return browser
+    
+    async def acquire_context(
+        self,
+        browser_type: str = "chromium",
+        headless: bool = True,
+        **context_options: Any
+    ) -> BrowserContext:
+        """
+        Create a new isolated context on the shared browser.
+        
+        Args:
+            browser_type: Browser type (chromium, firefox, webkit)
+            headless: Whether to run in headless mode
+            **context_options: Options passed to Browser.new_context()
+        
+        Returns:
+            A new BrowserContext; the caller is responsible for closing it
+        """
+        browser = await self.get_browser(browser_type, headless)
+        return await browser.new_context(**context_options)
+    
+    async def close(self):
+        """Close all pooled browsers and stop the Playwright driver."""
+        browsers = list(self._browsers.values())
+        playwright = self._playwright
+        self._browsers = {}
+        self._playwright = None
+        
+        for browser in browsers:
+            await browser.close()
+        if playwright:
+            await playwright.stop()
+    
+    def _shutdown(self):
+        """Close the pool at interpreter exit if its loop is still usable."""
+        loop = self._loop
+        if not self._playwright or loop is None or loop.is_closed() or loop.is_running():
+            return
+        loop.run_until_complete(self.close())
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+        atexit.register(_pool._shutdown)
+    return _pool
@@ -4,9 +4,96 @@ import asyncio
 import hashlib
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from typing import Optional, Dict, Any, List, Set, Tuple, Callable, Awaitable
+from playwright.async_api import Browser, Page, BrowserContext, Locator, Frame, Error as PlaywrightError
 from ..models.action import Action, ActionType
+from .browser_pool import BrowserPool, get_browser_pool
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+# Argument and metadata builders shared by the action dispatch table
+def _selector_args(action: Action) -> tuple:
+    """Arguments for handlers taking (selector, timeout)."""
+    return (action.selector, action.timeout)
+
+
+def _selector_value_args(action: Action) -> tuple:
+    """Arguments for handlers taking (selector, value, timeout)."""
+    return (action.selector, action.value, action.timeout)
+
+
+def _selector_meta(action: Action, _: Any) -> Dict[str, Any]:
+    """Metadata recording the selector an action targeted."""
+    return {"selector": action.selector}
+
+
+# Cheap structural fingerprint: interactive element count, title and URL
+_FINGERPRINT_JS = (
+    "() => document.querySelectorAll('[id],[data-testid],button,a,input,select,textarea').length"
+    " + '|' + document.title + '|' + location.href"
+)
+
+# Read every selector in one round-trip: innerText of the first visible match,
+# or null when the selector is not plain CSS, matches nothing or is hidden
+_READ_BATCH_JS = """(selectors) => selectors.map((sel) => {
+    let el;
+    try { el = document.querySelector(sel); } catch (e) { return null; }
+    if (!el) return null;
+    const visible = el.checkVisibility
+        ? el.checkVisibility()
+        : !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    return visible ? el.innerText : null;
+})"""
+
+# Actions execute_readonly_batch() can answer from a single DOM read
+READONLY_ACTIONS = frozenset({
+    ActionType.ASSERT_ELEMENT,
+    ActionType.ASSERT_TEXT,
+    ActionType.EXTRACT,
+})
+
+
+def content_hash(data: bytes) -> str:
+    """Hash a raw HTTP document body, for detecting unchanged pages."""
+    return hashlib.sha256(data).hexdigest()
+
+
+# Characters encoded per hash update in hash_text()
+_HASH_CHUNK = 1 << 20
+
+
+def hash_text(text: str, secure: bool = False) -> str:
+    """
+    Hash a string as UTF-8 without materializing the whole encoded copy.
+    
+    Only one chunk's worth of encoded bytes exists at a time, which matters
+    for multi-megabyte page content.
+    
+    Args:
+        text: Text to hash
+        secure: Use SHA-256 even when the faster non-cryptographic
+            xxh3_64 is available
+    
+    Returns:
+        Hex digest (xxh3_64 when xxhash is installed, else SHA-256)
+    """
+    if secure or xxhash is None:
+        h = hashlib.sha256()
+    else:
+        h = xxhash.xxh3_64()
+    for i in range(0, len(text), _HASH_CHUNK):
+        h.update(text[i:i + _HASH_CHUNK].encode())
+    return h.hexdigest()
+
+
+def _write_file(path: Path, data: bytes):
+    """Write a file, creating its directory if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
 
 
 class PlaywrightController:
@@ -17,13 +104,20 @@ class PlaywrightController:
     - Using stable selectors (data-testid preferred)
     - Enforcing explicit waits
     - Capturing deterministic state snapshots
+    
+    The browser itself is shared through a BrowserPool; each controller
+    owns only its own BrowserContext and page.
     """
     
+    # Seconds a click has to start a navigation before it is treated as in-page
+    NAVIGATION_GRACE = 0.05
+    
     def __init__(
         self,
         headless: bool = True,
         browser_type: str = "chromium",
-        screenshots_dir: str = "./screenshots"
+        screenshots_dir: str = "./screenshots",
+        pool: Optional[BrowserPool] = None
     ):
         """
         Initialize the browser controller.
@@ -32,45 +126,133 @@ class PlaywrightController:
             headless: Whether to run in headless mode
             browser_type: Browser type (chromium, firefox, webkit)
             screenshots_dir: Directory to store screenshots
+            pool: Browser pool to draw from (defaults to the shared pool)
         """
         self.headless = headless
         self.browser_type = browser_type
+        # Created on the first screenshot
         self.screenshots_dir = Path(screenshots_dir)
-        self.screenshots_dir.mkdir(parents=True, exist_ok=True)
+        self.pool = pool or get_browser_pool()
+        
+        # action type -> (handler, handler args, result metadata), keyed by the
+        # enum value to match Action.type, which use_enum_values stores as a
+        # plain string (ActionType members hash and compare equal to their
+        # values, so lookups by member work as well)
+        self._dispatch: Dict[str, Tuple[
+            Callable[..., Awaitable[Any]],
+            Callable[[Action], tuple],
+            Callable[[Action, Any], Dict[str, Any]]
+        ]] = {
+            ActionType.NAVIGATE.value: (
+                self._navigate, lambda a: (a.value,), lambda a, _: {"url": a.value}
+            ),
+            ActionType.CLICK.value: (self._click, _selector_args, _selector_meta),
+            ActionType.TYPE.value: (self._type, _selector_value_args, _selector_meta),
+            ActionType.SELECT.value: (self._select, _selector_value_args, _selector_meta),
+            ActionType.WAIT.value: (
+                self._wait,
+                lambda a: (a.value or "load", a.timeout),
+                lambda a, _: {"wait_type": a.value}
+            ),
+            ActionType.SCROLL.value: (self._scroll, _selector_args, _selector_meta),
+            ActionType.SCREENSHOT.value: (
+                self._screenshot, lambda a: (a.value,), lambda a, path: {"screenshot_path": str(path)}
+            ),
+            ActionType.ASSERT_TEXT.value: (
+                self._assert_text,
+                lambda a: (a.selector, a.text, a.timeout),
+                lambda a, _: {"text": a.text}
+            ),
+            ActionType.ASSERT_ELEMENT.value: (self._assert_element, _selector_args, _selector_meta),
+            ActionType.EXTRACT.value: (
+                self._extract_text, _selector_args, lambda a, text: {"extracted_text": text}
+            ),
+        }
+        
+        # When enabled, (url, content_hash) of the last navigation's document
+        self.capture_responses = False
+        self.last_response: Optional[Tuple[str, str]] = None
         
-        self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         
-    async def start(self):
-        """Start the browser instance."""
-        self.playwright = await async_playwright().start()
+        # Locators are re-resolved on every use, so they never go stale
+        self._locators: Dict[str, Locator] = {}
         
-        browser_launcher = getattr(self.playwright, self.browser_type)
-        self.browser = await browser_launcher.launch(headless=self.headless)
+        # Screenshot files still being written in the background, and the
+        # errors of writes that failed (by path; those not yet raised by
+        # flush_screenshots() are also kept in _unraised_errors)
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.screenshot_errors: Dict[str, BaseException] = {}
+        self._unraised_errors: List[BaseException] = []
+        # Fast hash of the last snapshotted content and its SHA-256 digest
+        self._last_dom: Optional[Tuple[str, str]] = None
         
+        # Main-frame navigations seen so far, to tell whether an action navigated
+        self._navigations = 0
+    
+    @classmethod
+    async def get_shared(
+        cls,
+        headless: bool = True,
+        browser_type: str = "chromium",
+        screenshots_dir: str = "./screenshots"
+    ) -> "PlaywrightController":
+        """
+        Get a started controller on the process-wide shared browser.
+        
+        The browser is launched on first use and kept alive; the returned
+        controller has its own fresh context, so stop() only closes that.
+        
+        Args:
+            headless: Whether to run in headless mode
+            browser_type: Browser type (chromium, firefox, webkit)
+            screenshots_dir: Directory to store screenshots
+            
+        Returns:
+            A started PlaywrightController
+        """
+        controller = cls(
+            headless=headless,
+            browser_type=browser_type,
+            screenshots_dir=screenshots_dir,
+            pool=get_browser_pool()
+        )
+        await controller.start()
+        return controller
+        
+    async def start(self):
+        """Open a fresh browser context and page on the pooled browser."""
         # Create context with deterministic viewport
-        self.context = await self.browser.new_context(
+        self.context = await self.pool.acquire_context(
+            self.browser_type,
+            self.headless,
             viewport={"width": 1280, "height": 720},
             user_agent="TestTool/1.0 (Deterministic Testing)"
         )
+        self.browser = self.context.browser
         
         self.page = await self.context.new_page()
         
         # Set deterministic timeouts
         self.page.set_default_timeout(30000)
         
+        self.page.on("framenavigated", self._on_frame_navigated)
+        
     async def stop(self):
-        """Stop the browser instance."""
-        if self.page:
-            await self.page.close()
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        """Close this controller's page and context; the browser stays pooled."""
+        try:
+            await self.flush_screenshots()
+        finally:
+            if self.page:
+                await self.page.close()
+            if self.context:
+                await self.context.close()
+            self.page = None
+            self.context = None
+            self.browser = None
+            self._locators.clear()
             
     async def execute_action(self, action: Action) -> Dict[str, Any]:
         """
@@ -89,45 +271,11 @@ class PlaywrightController:
         result = {"success": True, "metadata": {}}
         
         try:
-            if action.type == ActionType.NAVIGATE:
-                await self._navigate(action.value)
-                result["metadata"]["url"] = action.value
-                
-            elif action.type == ActionType.CLICK:
-                await self._click(action.selector, action.timeout)
-                result["metadata"]["selector"] = action.selector
-                
-            elif action.type == ActionType.TYPE:
-                await self._type(action.selector, action.value, action.timeout)
-                result["metadata"]["selector"] = action.selector
-                
-            elif action.type == ActionType.SELECT:
-                await self._select(action.selector, action.value, action.timeout)
-                result["metadata"]["selector"] = action.selector
-                
-            elif action.type == ActionType.WAIT:
-                await self._wait(action.value or "load", action.timeout)
-                result["metadata"]["wait_type"] = action.value
-                
-            elif action.type == ActionType.SCROLL:
-                await self._scroll(action.selector, action.timeout)
-                result["metadata"]["selector"] = action.selector
-                
-            elif action.type == ActionType.SCREENSHOT:
-                path = await self._screenshot(action.value)
-                result["metadata"]["screenshot_path"] = str(path)
-                
-            elif action.type == ActionType.ASSERT_TEXT:
-                await self._assert_text(action.selector, action.text, action.timeout)
-                result["metadata"]["text"] = action.text
-                
-            elif action.type == ActionType.ASSERT_ELEMENT:
-                await self._assert_element(action.selector, action.timeout)
-                result["metadata"]["selector"] = action.selector
-                
-            elif action.type == ActionType.EXTRACT:
-                extracted = await self._extract_text(action.selector, action.timeout)
-                result["metadata"]["extracted_text"] = extracted
+            entry = self._dispatch.get(action.type)
+            if entry is not None:
+                handler, build_args, build_metadata = entry
+                value = await handler(*build_args(action))
+                result["metadata"] = build_metadata(action, value)
                 
         except Exception as e:
             result["success"] = False
@@ -137,26 +285,112 @@ class PlaywrightController:
         
         return result
     
+    async def execute_readonly_batch(self, actions: List[Action]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Execute consecutive read-only actions with a single page evaluation.
+        
+        Elements that are already present and visible are read in one
+        round-trip instead of one per action.
+        
+        Args:
+            actions: ASSERT_ELEMENT, ASSERT_TEXT and EXTRACT actions
+            
+        Returns:
+            A result per action in execute_action()'s format, or None where
+            the element could not be read directly (not plain CSS, missing or
+            hidden); the caller should fall back to execute_action() for those
+        """
+        if not self.page:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        start_time = time.time()
+        texts = await self.page.evaluate(_READ_BATCH_JS, [action.selector for action in actions])
+        duration = (time.time() - start_time) * 1000 / max(len(actions), 1)
+        
+        results: List[Optional[Dict[str, Any]]] = []
+        for action, text in zip(actions, texts):
+            if text is None or action.type not in READONLY_ACTIONS or (
+                action.type == ActionType.ASSERT_TEXT and action.text is None
+            ):
+                results.append(None)
+                continue
+            
+            result = {"success": True, "metadata": {}, "duration_ms": duration}
+            if action.type == ActionType.EXTRACT:
+                result["metadata"] = {"extracted_text": text}
+            elif action.type == ActionType.ASSERT_TEXT:
+                if action.text not in text:
+                    result["success"] = False
+                    result["error"] = f"Expected text '{action.text}' not found. Actual: '{text}'"
+                else:
+                    result["metadata"] = {"text": action.text}
+            else:
+                result["metadata"] = {"selector": action.selector}
+            results.append(result)
+        
+        return results
+    
+    def _on_frame_navigated(self, frame: Frame):
+        """Count main-frame navigations."""
+        if frame == self.page.main_frame:
+            self._navigations += 1
+    
+    def _locate(self, selector: str) -> Locator:
+        """
+        Get an auto-waiting locator for the first element matching a selector.
+        
+        Locator actions wait for the element and act on it in a single
+        round-trip. ``.first`` keeps the old wait_for_selector() behaviour of
+        using the first match instead of failing in strict mode.
+        """
+        locator = self._locators.get(selector)
+        if locator is None:
+            locator = self._locators[selector] = self.page.locator(selector).first
+        return locator
+    
     async def _navigate(self, url: str):
         """Navigate to URL and wait for load."""
-        await self.page.goto(url, wait_until="domcontentloaded")
+        response = await self.page.goto(url, wait_until="domcontentloaded")
+        
+        self.last_response = None
+        if self.capture_responses and response is not None:
+            try:
+                self.last_response = (url, content_hash(await response.body()))
+            except PlaywrightError:
+                pass
+        
+    async def _settle(self, navigations_before: int, grace: float = 0.0):
+        """
+        Wait for the page to load if the preceding action navigated.
+        
+        Args:
+            navigations_before: Value of the navigation counter before the action
+            grace: Seconds to allow for a navigation to start before assuming
+                the action did not navigate
+        """
+        if grace and self._navigations == navigations_before:
+            await asyncio.sleep(grace)
+        if self._navigations != navigations_before:
+            await self.page.wait_for_load_state("domcontentloaded")
         
     async def _click(self, selector: str, timeout: int):
         """Click element with deterministic waiting."""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        await element.click()
-        # Wait for potential navigation or state changes
-        await self.page.wait_for_load_state("domcontentloaded")
+        navigations = self._navigations
+        await self._locate(selector).click(timeout=timeout)
+        # Most clicks (menus, modals) don't navigate; only wait when one did
+        await self._settle(navigations, self.NAVIGATION_GRACE)
         
     async def _type(self, selector: str, value: str, timeout: int):
         """Type into element."""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        await element.fill(value)
+        navigations = self._navigations
+        await self._locate(selector).fill(value, timeout=timeout)
+        await self._settle(navigations)
         
     async def _select(self, selector: str, value: str, timeout: int):
         """Select option from dropdown."""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        await element.select_option(value)
+        navigations = self._navigations
+        await self._locate(selector).select_option(value, timeout=timeout)
+        await self._settle(navigations)
         
     async def _wait(self, wait_type: str, timeout: int):
         """Wait for specific condition."""
@@ -171,8 +405,7 @@ class PlaywrightController:
     async def _scroll(self, selector: Optional[str], timeout: int):
         """Scroll to element or position."""
         if selector:
-            element = await self.page.wait_for_selector(selector, timeout=timeout)
-            await element.scroll_into_view_if_needed()
+            await self._locate(selector).scroll_into_view_if_needed(timeout=timeout)
         else:
             await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             
@@ -184,13 +417,39 @@ class PlaywrightController:
             name += '.png'
             
         path = self.screenshots_dir / name
-        await self.page.screenshot(path=str(path), full_page=True)
+        png = await self.page.screenshot(full_page=True)
+        
+        # Write the file off the event loop; stop() waits for pending writes
+        task = asyncio.create_task(asyncio.to_thread(_write_file, path, png))
+        self._pending_writes.add(task)
+        task.add_done_callback(lambda task: self._on_write_done(path, task))
         return path
     
+    def _on_write_done(self, path: Path, task: asyncio.Task):
+        """Forget a finished screenshot write, recording its error if it failed."""
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.screenshot_errors[str(path)] = task.exception()
+            self._unraised_errors.append(task.exception())
+    
+    async def flush_screenshots(self):
+        """
+        Wait until all screenshots taken so far are written to disk.
+        
+        Raises:
+            OSError: If a write failed since the last flush; every failure is
+                kept in screenshot_errors by path
+        """
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        if self._unraised_errors:
+            error = self._unraised_errors[0]
+            self._unraised_errors = []
+            raise error
+    
     async def _assert_text(self, selector: str, expected_text: str, timeout: int):
         """Assert element contains expected text."""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        actual_text = await element.inner_text()
+        actual_text = await self._locate(selector).inner_text(timeout=timeout)
         if expected_text not in actual_text:
             raise AssertionError(
                 f"Expected text '{expected_text}' not found. Actual: '{actual_text}'"
@@ -198,19 +457,45 @@ class PlaywrightController:
             
     async def _assert_element(self, selector: str, timeout: int):
         """Assert element exists."""
-        await self.page.wait_for_selector(selector, timeout=timeout)
+        await self._locate(selector).wait_for(timeout=timeout)
         
     async def _extract_text(self, selector: str, timeout: int) -> str:
         """Extract text from element."""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        return await element.inner_text()
+        return await self._locate(selector).inner_text(timeout=timeout)
     
-    async def get_dom_snapshot(self) -> str:
-        """Get deterministic DOM snapshot hash."""
+    async def get_dom_snapshot(self, secure: bool = False) -> str:
+        """
+        Get deterministic DOM snapshot hash.
+        
+        Args:
+            secure: Hash with SHA-256 (e.g. for audit logs) instead of the
+                faster non-cryptographic hash used for change detection
+        
+        Returns:
+            Hex digest of the page content
+        """
         content = await self.page.content()
         # Remove non-deterministic elements (timestamps, IDs, etc.)
         # This is a simplified version - real implementation would need more filtering
-        return hashlib.sha256(content.encode()).hexdigest()
+        key = hash_text(content)
+        if not secure:
+            return key
+        # Unchanged DOM between steps: reuse the previous SHA-256 digest, keyed
+        # by the fast hash so the page content itself isn't kept alive
+        if self._last_dom and self._last_dom[0] == key:
+            return self._last_dom[1]
+        digest = key if xxhash is None else hash_text(content, secure=True)
+        self._last_dom = (key, digest)
+        return digest
+    
+    async def get_dom_fingerprint(self) -> str:
+        """
+        Get a lightweight DOM fingerprint for change detection.
+        
+        Computed in the page and only a few bytes cross the wire, unlike
+        get_dom_snapshot() which transfers the full page content.
+        """
+        return await self.page.evaluate(_FINGERPRINT_JS)
     
     async def get_network_events(self) -> List[Dict[str, Any]]:
         """Get captured network events."""
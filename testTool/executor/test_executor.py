@@ -1,12 +1,38 @@
 """Test executor for deterministic playback of test scripts."""
 
+import os
 import time
+import uuid
 import asyncio
-from typing import Optional, Dict, Any
+import urllib.request
+from typing import Optional, Dict, Any, List
 from pathlib import Path
-from ..models.test_script import TestScript
+from ..models.action import Action, ActionType
+from ..models.test_script import TestScript, TestStep
 from ..models.execution_result import ExecutionResult, StepResult
-from ..browser_control.playwright_controller import PlaywrightController
+from ..browser_control.playwright_controller import PlaywrightController, READONLY_ACTIONS, content_hash
+from ..browser_control.browser_pool import get_browser_pool
+from ..learning_layer.knowledge_base import KnowledgeBase
+from ..utils import json_io
+
+
+# Actions that can change the DOM; other steps reuse the previous fingerprint
+MUTATING_ACTIONS = frozenset({
+    ActionType.CLICK,
+    ActionType.TYPE,
+    ActionType.SELECT,
+    ActionType.NAVIGATE,
+})
+
+# Steps that can be answered from a cached skill after a NAVIGATE
+SKILL_ACTIONS = frozenset({ActionType.EXTRACT, ActionType.ASSERT_TEXT})
+
+
+def _fetch_document(url: str, timeout: float) -> bytes:
+    """Fetch the raw HTML document for a URL."""
+    request = urllib.request.Request(url, headers={"User-Agent": "TestTool/1.0 (Deterministic Testing)"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
 
 
 class TestExecutor:
@@ -17,30 +43,49 @@ class TestExecutor:
     - Same script produces same execution sequence
     - Proper error handling and reporting
     - Detailed execution logs
+    
+    Each execution runs in its own browser context, so independent scripts
+    can be executed concurrently with execute_many().
+    
+    With a knowledge base, NAVIGATE followed by EXTRACT or ASSERT_TEXT is
+    replayed from a cached skill, without the browser, when the page's HTML
+    document is byte-identical to when the skill was captured. This assumes
+    the extracted text is determined by that document; pages that render
+    data fetched by scripts should not use skills.
     """
     
     def __init__(
         self,
         headless: bool = True,
         screenshots_dir: str = "./screenshots",
-        results_dir: str = "./test_results"
+        results_dir: str = "./test_results",
+        max_parallel: Optional[int] = None,
+        verify_dom: bool = False,
+        knowledge_base: Optional[KnowledgeBase] = None
     ):
         """
         Initialize the test executor.
         
         Args:
             headless: Whether to run browser in headless mode
-            screenshots_dir: Directory for screenshots
+            screenshots_dir: Directory for screenshots, with one subdirectory
+                per execution
             results_dir: Directory for execution results
+            max_parallel: Maximum concurrent executions in execute_many()
+                (defaults to the CPU count)
+            verify_dom: Hash the full page content after every step instead
+                of fingerprinting only after mutating actions
+            knowledge_base: Knowledge base for capturing and replaying skills
         """
         self.headless = headless
         self.screenshots_dir = Path(screenshots_dir)
         self.results_dir = Path(results_dir)
+        self.max_parallel = max_parallel or os.cpu_count() or 1
+        self.verify_dom = verify_dom
+        self.knowledge_base = knowledge_base
         
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
         self.results_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.controller: Optional[PlaywrightController] = None
     
     async def execute(self, script: TestScript) -> ExecutionResult:
         """
@@ -56,29 +101,95 @@ class TestExecutor:
         step_results = []
         all_success = True
         
-        # Initialize browser controller
-        self.controller = PlaywrightController(
+        # Names this execution's screenshot directory and result file, so
+        # concurrent runs of same-named scripts don't overwrite each other
+        run_id = f"{script.name}_{int(start_time)}_{uuid.uuid4().hex[:8]}"
+        
+        # Initialize browser controller; it is started on the first step that
+        # can't be replayed from a skill
+        controller = PlaywrightController(
             headless=self.headless,
-            screenshots_dir=str(self.screenshots_dir)
+            screenshots_dir=str(self.screenshots_dir / run_id)
         )
+        controller.capture_responses = self.knowledge_base is not None
+        started = False
+        
+        # URL of a navigation skipped by skill replay, still owed to the browser,
+        # and the position of its result in step_results
+        deferred_url = None
+        deferred_result = None
         
         try:
-            await self.controller.start()
-            
             # Execute each step
-            for i, step in enumerate(script.steps):
-                step_result = await self._execute_step(i, step)
-                step_results.append(step_result)
+            steps = script.steps
+            dom_snapshot = None
+            i = 0
+            while i < len(steps):
+                step = steps[i]
+                
+                if self.knowledge_base is not None and i + 1 < len(steps):
+                    replayed = await self._replay_skill(i, step, steps[i + 1])
+                    if replayed:
+                        deferred_result = len(step_results)
+                        step_results.extend(replayed)
+                        deferred_url = step.action.value
+                        i += 2
+                        continue
+                
+                if not started:
+                    await controller.start()
+                    started = True
+                if deferred_url and step.action.type != ActionType.NAVIGATE:
+                    navigation = await controller.execute_action(Action(type=ActionType.NAVIGATE, value=deferred_url))
+                    # The browser is now on a different page than the last snapshot
+                    dom_snapshot = None
+                    if not navigation["success"]:
+                        all_success = False
+                        step_results[deferred_result] = step_results[deferred_result].model_copy(
+                            update={"success": False, "error": navigation.get("error")}
+                        )
+                deferred_url = None
+                
+                # Consecutive read-only steps are answered with one DOM read
+                end = i
+                while end < len(steps) and steps[end].action.type in READONLY_ACTIONS and not steps[end].screenshot:
+                    end += 1
+                if end - i >= 2:
+                    run_results = await self._execute_readonly_run(controller, i, steps[i:end], dom_snapshot)
+                else:
+                    run_results = [await self._execute_step(controller, i, step, dom_snapshot)]
                 
-                if not step_result.success:
-                    all_success = False
-                    # Optionally stop on first failure
-                    # break
+                for step_result in run_results:
+                    step_results.append(step_result)
+                    dom_snapshot = step_result.dom_snapshot
+                    
+                    if not step_result.success:
+                        all_success = False
+                        # Optionally stop on first failure
+                        # break
+                    elif self.knowledge_base is not None and i > 0:
+                        self._capture_skill(controller, steps[i - 1], steps[i], step_result)
+                    
+                    i += 1
+            
+            if started:
+                # A step only succeeded if its screenshot reached the disk
+                try:
+                    await controller.flush_screenshots()
+                except OSError:
+                    pass
+                for j, step_result in enumerate(step_results):
+                    error = controller.screenshot_errors.get(step_result.screenshot_path)
+                    if error is not None:
+                        all_success = False
+                        step_results[j] = step_result.model_copy(
+                            update={"success": False, "error": f"Screenshot not saved: {error}"}
+                        )
             
         finally:
             # Always cleanup
-            if self.controller:
-                await self.controller.stop()
+            if started:
+                await controller.stop()
         
         total_duration = (time.time() - start_time) * 1000
         
@@ -89,28 +200,139 @@ class TestExecutor:
             total_duration_ms=total_duration
         )
         
-        # Save result
-        self._save_result(result)
+        # Save result off the event loop so concurrent scripts keep running
+        await asyncio.to_thread(self._save_result, result, run_id)
         
         return result
     
-    async def _execute_step(self, index: int, step) -> StepResult:
+    async def execute_many(self, scripts: List[TestScript]) -> List[ExecutionResult]:
+        """
+        Execute independent test scripts concurrently.
+        
+        Every script gets its own browser context on the shared browser, and at
+        most max_parallel scripts run at once.
+        
+        Args:
+            scripts: The test scripts to execute
+            
+        Returns:
+            ExecutionResults in the same order as scripts
+        """
+        if not scripts:
+            return []
+        
+        # Launch the shared browser once up front instead of racing for it
+        await get_browser_pool().get_browser(headless=self.headless)
+        
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def run(script: TestScript) -> ExecutionResult:
+            async with semaphore:
+                return await self.execute(script)
+        
+        return list(await asyncio.gather(*(run(script) for script in scripts)))
+    
+    async def _replay_skill(self, index: int, step: TestStep, next_step: TestStep) -> Optional[List[StepResult]]:
+        """
+        Replay a NAVIGATE + EXTRACT/ASSERT_TEXT pair from a cached skill.
+        
+        Returns:
+            StepResults for both steps, or None if the pair must run in the browser
+        """
+        action, next_action = step.action, next_step.action
+        if action.type != ActionType.NAVIGATE or next_action.type not in SKILL_ACTIONS:
+            return None
+        if step.screenshot or next_step.screenshot:
+            return None
+        if not action.value or not action.value.startswith(("http://", "https://")):
+            return None
+        
+        skill = self.knowledge_base.get_skill(action.value, next_action.selector)
+        if skill is None:
+            return None
+        
+        start_time = time.time()
+        try:
+            body = await asyncio.to_thread(_fetch_document, action.value, action.timeout / 1000)
+        except (OSError, ValueError):
+            return None
+        
+        if content_hash(body) != skill["content_hash"]:
+            return None
+        
+        value = skill["value"]
+        if next_action.type == ActionType.ASSERT_TEXT:
+            # Let the browser produce the authoritative failure
+            if not next_action.text or next_action.text not in value:
+                return None
+            next_metadata = {"text": next_action.text}
+        else:
+            next_metadata = {"extracted_text": value}
+        
+        duration = (time.time() - start_time) * 1000
+        return [
+            StepResult(
+                step_index=index,
+                success=True,
+                duration_ms=duration,
+                metadata={"url": action.value, "skill_replay": True}
+            ),
+            StepResult(
+                step_index=index + 1,
+                success=True,
+                duration_ms=0.0,
+                metadata={**next_metadata, "skill_replay": True}
+            ),
+        ]
+    
+    def _capture_skill(
+        self,
+        controller: PlaywrightController,
+        previous_step: TestStep,
+        step: TestStep,
+        step_result: StepResult
+    ):
+        """Store an EXTRACT that directly followed a NAVIGATE as a skill."""
+        if step.action.type != ActionType.EXTRACT or previous_step.action.type != ActionType.NAVIGATE:
+            return
+        if not controller.last_response or controller.last_response[0] != previous_step.action.value:
+            return
+        
+        self.knowledge_base.add_skill(
+            previous_step.action.value,
+            step.action.selector,
+            step_result.metadata["extracted_text"],
+            controller.last_response[1]
+        )
+    
+    async def _execute_step(
+        self,
+        controller: PlaywrightController,
+        index: int,
+        step,
+        last_snapshot: Optional[str] = None
+    ) -> StepResult:
         """Execute a single test step."""
         step_start = time.time()
         
         try:
             # Execute the action
-            action_result = await self.controller.execute_action(step.action)
+            action_result = await controller.execute_action(step.action)
             
             # Capture screenshot if requested
             screenshot_path = None
             if step.screenshot:
                 screenshot_path = str(
-                    await self.controller._screenshot(f"step_{index}")
+                    await controller._screenshot(f"step_{index}")
                 )
             
-            # Get DOM snapshot hash for verification
-            dom_snapshot = await self.controller.get_dom_snapshot()
+            # Get DOM state for verification; read-only steps leave it unchanged
+            if self.verify_dom:
+                dom_snapshot = await controller.get_dom_snapshot()
+            elif step.action.type in MUTATING_ACTIONS or last_snapshot is None:
+                dom_snapshot = await controller.get_dom_fingerprint()
+            else:
+                dom_snapshot = last_snapshot
             
             duration = (time.time() - step_start) * 1000
             
@@ -136,15 +358,68 @@ class TestExecutor:
                 metadata={}
             )
     
-    def _save_result(self, result: ExecutionResult):
-        """Save execution result to file."""
-        import json
+    async def _execute_readonly_run(
+        self,
+        controller: PlaywrightController,
+        index: int,
+        steps: List[TestStep],
+        last_snapshot: Optional[str] = None
+    ) -> List[StepResult]:
+        """
+        Execute consecutive read-only steps with a single batched DOM read.
         
-        filename = f"{result.script_name}_{int(time.time())}.json"
-        filepath = self.results_dir / filename
+        Steps the batch could not answer are executed individually.
         
-        with open(filepath, 'w') as f:
-            json.dump(result.model_dump(), f, indent=2, default=str)
+        Args:
+            controller: Started browser controller
+            index: Index of the first step in the script
+            steps: Read-only steps without screenshots
+            last_snapshot: DOM snapshot of the preceding step
+            
+        Returns:
+            A StepResult per step
+        """
+        try:
+            batch = await controller.execute_readonly_batch([step.action for step in steps])
+        except Exception:
+            batch = [None] * len(steps)
+        
+        results = []
+        dom_snapshot = last_snapshot
+        for offset, (step, action_result) in enumerate(zip(steps, batch)):
+            if action_result is not None and (dom_snapshot is None or self.verify_dom and offset == 0):
+                # Reads don't change the DOM, so one snapshot serves the run
+                try:
+                    dom_snapshot = await (
+                        controller.get_dom_snapshot() if self.verify_dom else controller.get_dom_fingerprint()
+                    )
+                except Exception:
+                    action_result = None
+            
+            if action_result is None:
+                step_result = await self._execute_step(controller, index + offset, step, dom_snapshot)
+            else:
+                step_result = StepResult(
+                    step_index=index + offset,
+                    success=action_result["success"],
+                    error=action_result.get("error"),
+                    screenshot_path=None,
+                    dom_snapshot=dom_snapshot,
+                    duration_ms=action_result["duration_ms"],
+                    metadata=action_result["metadata"]
+                )
+            results.append(step_result)
+            dom_snapshot = step_result.dom_snapshot
+        
+        return results
+    
+    def _save_result(self, result: ExecutionResult, run_id: str):
+        """Save execution result to file."""
+        filepath = self.results_dir / f"{run_id}.json"
+        
+        # Serialized by pydantic-core directly, without an intermediate dict
+        indent = 2 if json_io.indent_enabled() else None
+        filepath.write_text(result.model_dump_json(indent=indent), encoding="utf-8")
     
     def execute_sync(self, script: TestScript) -> ExecutionResult:
         """
@@ -156,4 +431,29 @@ class TestExecutor:
         Returns:
             ExecutionResult
         """
-        return asyncio.run(self.execute(script))
+        async def run() -> ExecutionResult:
+            try:
+                return await self.execute(script)
+            finally:
+                # The pooled browser cannot outlive this event loop
+                await get_browser_pool().close()
+        
+        return asyncio.run(run())
+    
+    def execute_many_sync(self, scripts: List[TestScript]) -> List[ExecutionResult]:
+        """
+        Synchronous wrapper for execute_many().
+        
+        Args:
+            scripts: The test scripts to execute
+            
+        Returns:
+            List of ExecutionResults
+        """
+        async def run() -> List[ExecutionResult]:
+            try:
+                return await self.execute_many(scripts)
+            finally:
+                await get_browser_pool().close()
+        
+        return asyncio.run(run())
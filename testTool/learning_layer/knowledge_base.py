@@ -1,8 +1,11 @@
 """Knowledge base for storing learned information."""
 
-import json
+import atexit
+import os
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from ..utils import json_io
 
 
 class KnowledgeBase:
@@ -14,24 +17,94 @@ class KnowledgeBase:
     - Successful interaction patterns
     - Application structure (routes, components, APIs)
     - Test execution history
+    - Skills (cached extraction results that can be replayed without a browser)
+    
+    State is persisted as a snapshot (``knowledge_base.json``) plus an
+    append-only journal (``knowledge_base.log``) holding one JSON line per
+    mutation. Loading replays the journal on top of the snapshot, and the
+    journal is folded into a new snapshot once it grows past
+    ``COMPACT_THRESHOLD`` bytes.
+    
+    Mutations are written through to disk unless made inside a
+    ``with kb:`` block, in which case they are appended once on exit.
     """
     
-    def __init__(self, base_path: str = "./knowledge_base"):
+    SNAPSHOT_FILE = "knowledge_base.json"
+    JOURNAL_FILE = "knowledge_base.log"
+    COMPACT_THRESHOLD = 1 << 20
+    
+    def __init__(self, base_path: str = "./knowledge_base", autosave_interval: float = 0.0):
         """
         Initialize the knowledge base.
         
         Args:
             base_path: Base directory for knowledge storage
+            autosave_interval: Minimum seconds between automatic writes
+                outside a batch (0 writes on every mutation). Pending
+                changes are flushed at interpreter exit, or earlier by
+                calling flush().
         """
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.autosave_interval = autosave_interval
         
         self.element_mappings: Dict[str, Dict[str, Any]] = {}
         self.routes: List[str] = []
         self.components: Dict[str, Any] = {}
         self.api_endpoints: List[str] = []
+        self.skills: Dict[str, Dict[str, Dict[str, str]]] = {}
+        
+        # Selector values per component, for O(1) duplicate checks
+        self._selector_index: Dict[str, Set[str]] = {}
+        
+        self._pending: List[Dict[str, Any]] = []
+        self._batch_depth = 0
+        self._last_save = float("-inf")
         
         self._load()
+        
+        if autosave_interval > 0:
+            # Debounced writes may still be pending when the process exits
+            atexit.register(self.flush)
+    
+    def __enter__(self) -> "KnowledgeBase":
+        """Start a batch; writes are deferred until the outermost exit."""
+        self._batch_depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        """End a batch and flush pending changes."""
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+    
+    def flush(self):
+        """Append pending mutations to the journal, if any."""
+        if not self._pending:
+            return
+        
+        journal = self.base_path / self.JOURNAL_FILE
+        lines = b"".join(json_io.dumps(op, indent=False) + b"\n" for op in self._pending)
+        with open(journal, 'ab') as f:
+            f.write(lines)
+        
+        self._pending = []
+        self._last_save = time.monotonic()
+        
+        if journal.stat().st_size > self.COMPACT_THRESHOLD:
+            self.compact()
+    
+    def compact(self):
+        """Write a full snapshot atomically and truncate the journal."""
+        snapshot = self.base_path / self.SNAPSHOT_FILE
+        tmp_file = snapshot.with_suffix(".json.tmp")
+        
+        json_io.dump_file(tmp_file, self._snapshot())
+        os.replace(tmp_file, snapshot)
+        
+        self._pending = []
+        self._last_save = time.monotonic()
+        (self.base_path / self.JOURNAL_FILE).unlink(missing_ok=True)
     
     def add_element_mapping(
         self,
@@ -49,20 +122,24 @@ class KnowledgeBase:
             selector_type: Type of selector (css, xpath, testid)
             metadata: Additional metadata
         """
-        if component_name not in self.element_mappings:
-            self.element_mappings[component_name] = {
-                "selectors": [],
-                "selector_type": selector_type,
-                "metadata": metadata or {}
-            }
-        
-        if selector not in [s["value"] for s in self.element_mappings[component_name]["selectors"]]:
-            self.element_mappings[component_name]["selectors"].append({
-                "value": selector,
-                "type": selector_type
-            })
+        self._record({
+            "op": "add_mapping",
+            "component": component_name,
+            "selector": selector,
+            "selector_type": selector_type,
+            "metadata": metadata or {}
+        })
+    
+    def add_element_mappings_bulk(self, mappings: Iterable[Tuple[str, str, str]]):
+        """
+        Add many element mappings with a single journal write.
         
-        self._save()
+        Args:
+            mappings: (component_name, selector, selector_type) tuples
+        """
+        with self:
+            for component_name, selector, selector_type in mappings:
+                self.add_element_mapping(component_name, selector, selector_type)
     
     def get_selector(self, component_name: str) -> Optional[str]:
         """
@@ -70,7 +147,7 @@ class KnowledgeBase:
         
         Args:
             component_name: Name of the component
-            
+        
         Returns:
             Selector string or None
         """
@@ -87,9 +164,18 @@ class KnowledgeBase:
         Args:
             route: Route path
         """
-        if route not in self.routes:
-            self.routes.append(route)
-            self._save()
+        self._record({"op": "add_route", "route": route})
+    
+    def add_routes_bulk(self, routes: Iterable[str]):
+        """
+        Add many application routes with a single journal write.
+        
+        Args:
+            routes: Route paths
+        """
+        with self:
+            for route in routes:
+                self.add_route(route)
     
     def add_component(self, name: str, component_info: Dict[str, Any]):
         """
@@ -99,8 +185,7 @@ class KnowledgeBase:
             name: Component name
             component_info: Component details
         """
-        self.components[name] = component_info
-        self._save()
+        self._record({"op": "add_component", "name": name, "info": component_info})
     
     def add_api_endpoint(self, endpoint: str):
         """
@@ -109,9 +194,38 @@ class KnowledgeBase:
         Args:
             endpoint: API endpoint URL or path
         """
-        if endpoint not in self.api_endpoints:
-            self.api_endpoints.append(endpoint)
-            self._save()
+        self._record({"op": "add_endpoint", "endpoint": endpoint})
+    
+    def add_skill(self, url: str, selector: str, value: str, content_hash: str):
+        """
+        Cache the text extracted from a selector on a page.
+        
+        Args:
+            url: URL of the page the text was extracted from
+            selector: Selector the text was extracted with
+            value: Extracted text
+            content_hash: Hash of the page's HTML document when extracted
+        """
+        self._record({
+            "op": "add_skill",
+            "url": url,
+            "selector": selector,
+            "value": value,
+            "content_hash": content_hash
+        })
+    
+    def get_skill(self, url: str, selector: str) -> Optional[Dict[str, str]]:
+        """
+        Get a cached extraction for a page and selector.
+        
+        Args:
+            url: Page URL
+            selector: Element selector
+            
+        Returns:
+            Dictionary with 'value' and 'content_hash', or None
+        """
+        return self.skills.get(url, {}).get(selector)
     
     def get_all_mappings(self) -> Dict[str, Dict[str, Any]]:
         """Get all element mappings."""
@@ -129,31 +243,111 @@ class KnowledgeBase:
         """Get all API endpoints."""
         return self.api_endpoints
     
+    def _record(self, op: Dict[str, Any]):
+        """Apply a mutation and queue it for the journal if it changed state."""
+        if self._apply(op):
+            self._pending.append(op)
+            self._mark_dirty()
+    
+    def _apply(self, op: Dict[str, Any]) -> bool:
+        """
+        Apply a single journal operation to in-memory state.
+        
+        Returns:
+            True if the operation changed state
+        """
+        kind = op.get("op")
+        
+        if kind == "add_mapping":
+            component_name = op["component"]
+            selector_type = op.get("selector_type", "css")
+            created = component_name not in self.element_mappings
+            if created:
+                self.element_mappings[component_name] = {
+                    "selectors": [],
+                    "selector_type": selector_type,
+                    "metadata": op.get("metadata") or {}
+                }
+            
+            selectors = self.element_mappings[component_name]["selectors"]
+            index = self._selector_index.get(component_name)
+            if index is None:
+                index = self._selector_index[component_name] = {s["value"] for s in selectors}
+            
+            if op["selector"] not in index:
+                index.add(op["selector"])
+                selectors.append({
+                    "value": op["selector"],
+                    "type": selector_type
+                })
+                return True
+            return created
+        
+        if kind == "add_route":
+            if op["route"] not in self.routes:
+                self.routes.append(op["route"])
+                return True
+            return False
+        
+        if kind == "add_component":
+            self.components[op["name"]] = op["info"]
+            return True
+        
+        if kind == "add_endpoint":
+            if op["endpoint"] not in self.api_endpoints:
+                self.api_endpoints.append(op["endpoint"])
+                return True
+            return False
+        
+        if kind == "add_skill":
+            skill = {"value": op["value"], "content_hash": op["content_hash"]}
+            page_skills = self.skills.setdefault(op["url"], {})
+            if page_skills.get(op["selector"]) == skill:
+                return False
+            page_skills[op["selector"]] = skill
+            return True
+        
+        return False
+    
+    def _mark_dirty(self):
+        """Write pending mutations unless batched or debounced."""
+        if self._batch_depth:
+            return
+        if time.monotonic() - self._last_save >= self.autosave_interval:
+            self.flush()
+    
     def _load(self):
-        """Load knowledge base from disk."""
-        kb_file = self.base_path / "knowledge_base.json"
-        
-        if kb_file.exists():
-            with open(kb_file, 'r') as f:
-                data = json.load(f)
-                self.element_mappings = data.get("element_mappings", {})
-                self.routes = data.get("routes", [])
-                self.components = data.get("components", {})
-                self.api_endpoints = data.get("api_endpoints", [])
-    
-    def _save(self):
-        """Save knowledge base to disk."""
-        kb_file = self.base_path / "knowledge_base.json"
-        
-        data = {
+        """Load the snapshot from disk and replay the journal on top."""
+        snapshot = self.base_path / self.SNAPSHOT_FILE
+        journal = self.base_path / self.JOURNAL_FILE
+        
+        if snapshot.exists():
+            data = json_io.load_file(snapshot)
+            self.element_mappings = data.get("element_mappings", {})
+            self.routes = data.get("routes", [])
+            self.components = data.get("components", {})
+            self.api_endpoints = data.get("api_endpoints", [])
+            self.skills = data.get("skills", {})
+        
+        if journal.exists():
+            with open(journal, 'rb') as f:
+                for line in f:
+                    try:
+                        op = json_io.loads(line)
+                    except ValueError:
+                        # A torn trailing line from an interrupted write
+                        continue
+                    self._apply(op)
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Build the serializable snapshot of the current state."""
+        return {
             "element_mappings": self.element_mappings,
             "routes": self.routes,
             "components": self.components,
-            "api_endpoints": self.api_endpoints
+            "api_endpoints": self.api_endpoints,
+            "skills": self.skills
         }
-        
-        with open(kb_file, 'w') as f:
-            json.dump(data, f, indent=2)
     
     def export_catalog(self) -> Dict[str, Any]:
         """
@@ -171,6 +365,7 @@ class KnowledgeBase:
                 "total_mappings": len(self.element_mappings),
                 "total_routes": len(self.routes),
                 "total_components": len(self.components),
-                "total_endpoints": len(self.api_endpoints)
+                "total_endpoints": len(self.api_endpoints),
+                "total_skills": sum(len(page) for page in self.skills.values())
             }
         }
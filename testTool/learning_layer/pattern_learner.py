@@ -1,13 +1,26 @@
 """Pattern learner for identifying common workflows."""
 
-import json
+import atexit
+import heapq
+import string
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, FrozenSet
+from collections import Counter, defaultdict
+from ..utils import json_io
 from ..models.test_script import TestScript
 from ..models.action import Action
 
 
+# Maps punctuation to spaces so tokenizing is a single translate() + split()
+_PUNCTUATION_TABLE = str.maketrans(string.punctuation, " " * len(string.punctuation))
+
+
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Split text into lowercase keywords, treating punctuation as whitespace."""
+    return frozenset(text.lower().translate(_PUNCTUATION_TABLE).split())
+
+
 class PatternLearner:
     """
     Learns from repeated interactions to identify common patterns.
@@ -17,23 +30,94 @@ class PatternLearner:
     - Detect common workflows
     - Build reusable test components
     - Improve selector stability
+    
+    Observations are written through to disk unless made inside a
+    ``with learner:`` block, in which case files are written once on exit.
+    
+    Patterns, workflows and selector mappings are each read from disk on
+    first access, so callers that only need one of them don't parse the
+    others, and collections that were never loaded are never rewritten.
     """
     
-    def __init__(self, knowledge_base_path: str = "./knowledge_base"):
+    def __init__(self, knowledge_base_path: str = "./knowledge_base", autosave_interval: float = 0.0):
         """
         Initialize the pattern learner.
         
         Args:
             knowledge_base_path: Path to knowledge base storage
+            autosave_interval: Minimum seconds between automatic writes
+                outside a batch (0 writes on every observation). Pending
+                changes are flushed at interpreter exit, or earlier by
+                calling flush().
         """
         self.kb_path = Path(knowledge_base_path)
         self.kb_path.mkdir(parents=True, exist_ok=True)
+        self.autosave_interval = autosave_interval
         
-        self.patterns: Dict[str, Any] = defaultdict(lambda: {"count": 0, "examples": []})
-        self.workflows: List[Dict[str, Any]] = []
-        self.selector_mappings: Dict[str, List[str]] = defaultdict(list)
+        # Loaded lazily by the properties of the same name
+        self._patterns: Optional[Dict[str, Dict[str, Any]]] = None
+        self._workflows: Optional[List[Dict[str, Any]]] = None
+        self._selector_mappings: Optional[Dict[str, List[str]]] = None
         
-        self._load_knowledge()
+        # Selectors per mapping key, for O(1) duplicate checks
+        self._selector_index: Dict[str, Set[str]] = {}
+        
+        # Per-workflow keyword sets and keyword -> workflow indices
+        self._wf_tokens: List[FrozenSet[str]] = []
+        self._inverted: Dict[str, Set[int]] = defaultdict(set)
+        
+        self._dirty = False
+        self._batch_depth = 0
+        self._last_save = float("-inf")
+        
+        if autosave_interval > 0:
+            # Debounced writes may still be pending when the process exits
+            atexit.register(self.flush)
+    
+    @property
+    def patterns(self) -> Dict[str, Dict[str, Any]]:
+        """Observed action sequences with their counts and example scripts."""
+        if self._patterns is None:
+            self._patterns = self._load_file("patterns.json", {})
+        return self._patterns
+    
+    @property
+    def workflows(self) -> List[Dict[str, Any]]:
+        """Observed workflows (scripts with 3+ steps)."""
+        if self._workflows is None:
+            self._workflows = self._load_file("workflows.json", [])
+            for workflow in self._workflows:
+                self._index_workflow(workflow)
+        return self._workflows
+    
+    @property
+    def selector_mappings(self) -> Dict[str, List[str]]:
+        """Selectors learned per "action_type:description" key."""
+        if self._selector_mappings is None:
+            self._selector_mappings = self._load_file("selectors.json", {})
+            self._selector_index = {
+                key: set(selectors) for key, selectors in self._selector_mappings.items()
+            }
+        return self._selector_mappings
+    
+    def __enter__(self) -> "PatternLearner":
+        """Start a batch; writes are deferred until the outermost exit."""
+        self._batch_depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        """End a batch and flush pending changes."""
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+    
+    def flush(self):
+        """Write pending observations to disk, if any."""
+        if not self._dirty:
+            return
+        self._save_knowledge()
+        self._dirty = False
+        self._last_save = time.monotonic()
     
     def observe_script(self, script: TestScript):
         """
@@ -43,21 +127,71 @@ class PatternLearner:
             script: The test script to learn from
         """
         # Extract action sequences
-        action_sequence = [step.action.type for step in script.steps]
-        sequence_key = " -> ".join(action_sequence)
+        sequence_key = self._sequence_key(script)
+        
+        entry = self._pattern_entry(sequence_key)
+        entry["count"] += 1
+        entry["examples"].append(script.name)
+        
+        self._learn_structure(script)
+        self._mark_dirty()
+    
+    def observe_scripts_bulk(self, scripts: List[TestScript]):
+        """
+        Observe many test scripts at once.
         
-        self.patterns[sequence_key]["count"] += 1
-        self.patterns[sequence_key]["examples"].append(script.name)
+        Equivalent to calling observe_script() for each script, but
+        sequences are tallied first, each distinct pattern is updated once,
+        and knowledge is written a single time at the end.
         
+        Args:
+            scripts: The test scripts to learn from
+        """
+        examples: Dict[str, List[str]] = defaultdict(list)
+        for script in scripts:
+            examples[self._sequence_key(script)].append(script.name)
+        
+        with self:
+            for sequence_key, names in examples.items():
+                entry = self._pattern_entry(sequence_key)
+                entry["count"] += len(names)
+                entry["examples"].extend(names)
+            
+            for script in scripts:
+                self._learn_structure(script)
+            
+            if scripts:
+                self._mark_dirty()
+    
+    def _pattern_entry(self, sequence_key: str) -> Dict[str, Any]:
+        """Get the stats for a sequence, creating them on first sight."""
+        entry = self.patterns.get(sequence_key)
+        if entry is None:
+            entry = self.patterns[sequence_key] = {"count": 0, "examples": []}
+        return entry
+    
+    @staticmethod
+    def _sequence_key(script: TestScript) -> str:
+        """Key identifying a script's sequence of action types."""
+        return " -> ".join([step.action.type for step in script.steps])
+    
+    def _learn_structure(self, script: TestScript):
+        """Learn selector mappings and workflows from a script."""
         # Learn selector patterns
+        selector_mappings = self.selector_mappings
         for step in script.steps:
             if step.action.selector:
                 action_type = step.action.type
                 selector = step.action.selector
                 
                 key = f"{action_type}:{step.description}"
-                if selector not in self.selector_mappings[key]:
-                    self.selector_mappings[key].append(selector)
+                index = self._selector_index.get(key)
+                if index is None:
+                    index = self._selector_index[key] = set()
+                    selector_mappings.setdefault(key, [])
+                if selector not in index:
+                    index.add(selector)
+                    selector_mappings[key].append(selector)
         
         # Identify workflows (sequences of 3+ actions)
         if len(script.steps) >= 3:
@@ -73,8 +207,7 @@ class PatternLearner:
                 ]
             }
             self.workflows.append(workflow)
-        
-        self._save_knowledge()
+            self._index_workflow(workflow)
     
     def get_common_patterns(self, min_count: int = 2) -> List[Dict[str, Any]]:
         """
@@ -129,25 +262,27 @@ class PatternLearner:
             List of similar workflows
         """
         # Simple keyword matching for now
-        keywords = set(description.lower().split())
+        workflows = self.workflows
+        keywords = _tokenize(description)
+        
+        # Count shared keywords per workflow straight from the posting lists;
+        # workflows sharing none can't score above zero and are never visited
+        overlap: Counter = Counter()
+        for keyword in keywords:
+            for i in self._inverted.get(keyword, ()):
+                overlap[i] += 1
         
         scored_workflows = []
-        for workflow in self.workflows:
-            workflow_text = f"{workflow['name']} {workflow['description']}".lower()
-            workflow_keywords = set(workflow_text.split())
-            
+        for i, intersection in overlap.items():
             # Calculate similarity (Jaccard index)
-            intersection = keywords & workflow_keywords
-            union = keywords | workflow_keywords
-            
-            if union:
-                similarity = len(intersection) / len(union)
-                if similarity > 0.1:  # Threshold
-                    scored_workflows.append((similarity, workflow))
+            union = len(keywords) + len(self._wf_tokens[i]) - intersection
+            similarity = intersection / union
+            if similarity > 0.1:  # Threshold
+                scored_workflows.append((similarity, -i))
         
-        # Sort by similarity and return top results
-        scored_workflows.sort(reverse=True, key=lambda x: x[0])
-        return [w for _, w in scored_workflows[:limit]]
+        # Top results by similarity, earliest observed first on ties
+        top = heapq.nlargest(max(limit, 0), scored_workflows)
+        return [workflows[-neg_i] for _, neg_i in top]
     
     def auto_generate_test(self, description: str) -> Optional[TestScript]:
         """
@@ -175,31 +310,34 @@ class PatternLearner:
         
         return None
     
-    def _load_knowledge(self):
-        """Load knowledge base from disk."""
-        patterns_file = self.kb_path / "patterns.json"
-        workflows_file = self.kb_path / "workflows.json"
-        selectors_file = self.kb_path / "selectors.json"
-        
-        if patterns_file.exists():
-            with open(patterns_file, 'r') as f:
-                self.patterns = defaultdict(lambda: {"count": 0, "examples": []}, json.load(f))
-        
-        if workflows_file.exists():
-            with open(workflows_file, 'r') as f:
-                self.workflows = json.load(f)
-        
-        if selectors_file.exists():
-            with open(selectors_file, 'r') as f:
-                self.selector_mappings = defaultdict(list, json.load(f))
+    def _index_workflow(self, workflow: Dict[str, Any]):
+        """Add a workflow (already appended to self.workflows) to the keyword index."""
+        i = len(self._wf_tokens)
+        tokens = _tokenize(f"{workflow['name']} {workflow['description']}")
+        self._wf_tokens.append(tokens)
+        for token in tokens:
+            self._inverted[token].add(i)
+    
+    def _mark_dirty(self):
+        """Record an observation and write it unless batched or debounced."""
+        self._dirty = True
+        if self._batch_depth:
+            return
+        if time.monotonic() - self._last_save >= self.autosave_interval:
+            self.flush()
+    
+    def _load_file(self, filename: str, default: Any) -> Any:
+        """Load one knowledge file, or return default if it doesn't exist."""
+        path = self.kb_path / filename
+        if path.exists():
+            return json_io.load_file(path)
+        return default
     
     def _save_knowledge(self):
-        """Save knowledge base to disk."""
-        with open(self.kb_path / "patterns.json", 'w') as f:
-            json.dump(dict(self.patterns), f, indent=2)
-        
-        with open(self.kb_path / "workflows.json", 'w') as f:
-            json.dump(self.workflows, f, indent=2)
-        
-        with open(self.kb_path / "selectors.json", 'w') as f:
-            json.dump(dict(self.selector_mappings), f, indent=2)
+        """Save loaded knowledge to disk."""
+        if self._patterns is not None:
+            json_io.dump_file(self.kb_path / "patterns.json", self._patterns)
+        if self._workflows is not None:
+            json_io.dump_file(self.kb_path / "workflows.json", self._workflows)
+        if self._selector_mappings is not None:
+            json_io.dump_file(self.kb_path / "selectors.json", self._selector_mappings)
@@ -1,25 +1,78 @@
 """Main CLI interface for the browser testing tool."""
 
 import click
-import asyncio
-import json
+import atexit
+from functools import lru_cache
 from pathlib import Path
-from rich.console import Console
+from typing import List, TYPE_CHECKING
+from rich.console import Console, Group
+from rich.panel import Panel
 from rich.table import Table
-from rich import print as rprint
+from rich.text import Text
 
-from .models.action import Action, ActionType
-from .models.test_script import TestScript, TestStep
-from .browser_control import PlaywrightController
-from .nl_processor import NLInterpreter
-from .recorder import TestRecorder, ScriptStorage
-from .executor import TestExecutor
-from .learning_layer import PatternLearner, KnowledgeBase
-from .utils import SourceAnalyzer
+# Heavier modules (pydantic models, Playwright) are imported by the commands
+# that use them, so `--help` and light commands start quickly
+if TYPE_CHECKING:
+    from .browser_control import PlaywrightController
+    from .nl_processor import NLInterpreter
 
 console = Console()
 
 
+class _LoopRunner:
+    """Minimal stand-in for asyncio.Runner (Python < 3.11): one event loop reused across run() calls."""
+    
+    def __init__(self):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+    
+    def run(self, coro):
+        return self._loop.run_until_complete(coro)
+    
+    def close(self):
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
+
+
+_runner = None
+
+
+def _run(coro):
+    """
+    Run a coroutine on the CLI's persistent event loop.
+    
+    Unlike asyncio.run(), the loop survives between commands run in one
+    process, and so does the pooled browser bound to it. Both are closed
+    at exit.
+    """
+    global _runner
+    if _runner is None:
+        import asyncio
+        _runner = asyncio.Runner() if hasattr(asyncio, "Runner") else _LoopRunner()
+        atexit.register(_close_runner)
+    return _runner.run(coro)
+
+
+def _close_runner():
+    """Close the pooled browser, then the persistent event loop."""
+    global _runner
+    runner, _runner = _runner, None
+    if runner is not None:
+        from .browser_control import get_browser_pool
+        try:
+            runner.run(get_browser_pool().close())
+        finally:
+            runner.close()
+
+
+@lru_cache(maxsize=4)
+def _get_interpreter(use_llm: bool, provider: str = "openai") -> "NLInterpreter":
+    """Get a shared interpreter, so its LLM client is created once per process."""
+    from .nl_processor import NLInterpreter
+    return NLInterpreter(use_llm=use_llm, llm_provider=provider)
+
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -36,9 +89,19 @@ def cli():
 @click.option('--name', required=True, help='Test script name')
 @click.option('--description', required=True, help='Test description')
 @click.option('--mode', type=click.Choice(['dumb', 'smart']), default='dumb', help='Operating mode')
-@click.option('--interactive/--no-interactive', default=True, help='Interactive mode')
-def record(name, description, mode, interactive):
+@click.option('--interactive/--no-interactive', default=None, help='Interactive mode (default unless --step is given)')
+@click.option('--step', 'steps', multiple=True, help='Instruction to record (repeatable; implies --no-interactive)')
+@click.option('--use-llm/--no-llm', default=False, help='Use LLM for interpreting --step instructions')
+@click.option('--format', type=click.Choice(['json', 'yaml', 'msgpack']), default='json', help='Script format')
+def record(name, description, mode, interactive, steps, use_llm, format):
     """Record a new test script."""
+    from .recorder import TestRecorder, ScriptStorage
+    
+    if interactive is None:
+        interactive = not steps
+    elif interactive and steps:
+        raise click.UsageError("--step cannot be combined with --interactive")
+    
     recorder = TestRecorder()
     recorder.start_recording(name, description, mode)
     
@@ -48,7 +111,7 @@ def record(name, description, mode, interactive):
     if interactive:
         console.print("\n[yellow]Enter commands (type 'done' to finish):[/yellow]")
         
-        interpreter = NLInterpreter(use_llm=False)
+        interpreter = _get_interpreter(False)
         step_num = 1
         
         while True:
@@ -75,10 +138,22 @@ def record(name, description, mode, interactive):
             console.print(f"[green]✓[/green] Recorded: {command}")
             step_num += 1
     
+    elif steps:
+        # Interpret all instructions up front so LLM requests overlap
+        interpreter = _get_interpreter(use_llm)
+        for command, actions in zip(steps, _run(interpreter.interpret_many(list(steps)))):
+            for action in actions:
+                recorder.record_step(
+                    description=command,
+                    action=action,
+                    screenshot=False
+                )
+            console.print(f"[green]✓[/green] Recorded: {command}")
+    
     # Stop recording and save
     script = recorder.stop_recording()
     storage = ScriptStorage()
-    filepath = storage.save(script, format='json')
+    filepath = storage.save(script, format=format)
     
     console.print(f"\n[green]✓ Test script saved:[/green] {filepath}")
     console.print(f"Total steps: {len(script.steps)}")
@@ -87,9 +162,12 @@ def record(name, description, mode, interactive):
 @cli.command()
 @click.argument('script_name')
 @click.option('--headless/--headed', default=True, help='Browser mode')
-@click.option('--format', type=click.Choice(['json', 'yaml']), default='json', help='Script format')
+@click.option('--format', type=click.Choice(['json', 'yaml', 'msgpack']), default='json', help='Script format')
 def execute(script_name, headless, format):
     """Execute a test script."""
+    from .recorder import ScriptStorage
+    from .executor import TestExecutor
+    
     console.print(f"[blue]Loading test script:[/blue] {script_name}")
     
     try:
@@ -103,20 +181,27 @@ def execute(script_name, headless, format):
         # Execute
         console.print("\n[yellow]Executing...[/yellow]")
         executor = TestExecutor(headless=headless)
-        result = executor.execute_sync(script)
+        result = _run(executor.execute(script))
         
-        # Display results
-        console.print("\n[bold]Execution Results[/bold]")
-        console.print(f"Success: {'✓' if result.success else '✗'}")
-        console.print(f"Duration: {result.total_duration_ms:.2f}ms")
-        console.print(f"Steps passed: {sum(1 for s in result.step_results if s.success)}/{len(result.step_results)}")
+        # Render the summary as one panel so it is laid out and written once
+        failed = [s for s in result.step_results if not s.success]
+        passed = len(result.step_results) - len(failed)
+        body = [
+            f"Success: {'✓' if result.success else '✗'}",
+            f"Duration: {result.total_duration_ms:.2f}ms",
+            f"Steps passed: {passed}/{len(result.step_results)}"
+        ]
         
         # Show failed steps
-        failed = [s for s in result.step_results if not s.success]
         if failed:
-            console.print("\n[red]Failed steps:[/red]")
+            table = Table(title="[red]Failed steps[/red]", title_justify="left")
+            table.add_column("Step", justify="right")
+            table.add_column("Error")
             for step in failed:
-                console.print(f"  Step {step.step_index}: {step.error}")
+                table.add_row(str(step.step_index), Text(step.error or ""))
+            body += ["", table]
+        
+        console.print(Panel(Group(*body), title="Execution Results", expand=False))
         
     except FileNotFoundError:
         console.print(f"[red]Error:[/red] Script '{script_name}' not found")
@@ -127,6 +212,8 @@ def execute(script_name, headless, format):
 @cli.command()
 def list_scripts():
     """List all available test scripts."""
+    from .recorder import ScriptStorage
+    
     storage = ScriptStorage()
     scripts = storage.list_scripts()
     
@@ -148,7 +235,7 @@ def list_scripts():
 @click.option('--use-llm/--no-llm', default=False, help='Use LLM for interpretation')
 def interpret(instruction, use_llm):
     """Interpret a natural language instruction."""
-    interpreter = NLInterpreter(use_llm=use_llm)
+    interpreter = _get_interpreter(use_llm)
     actions = interpreter.interpret(instruction)
     
     console.print(f"[blue]Instruction:[/blue] {instruction}")
@@ -169,6 +256,9 @@ def interpret(instruction, use_llm):
 @click.option('--output', '-o', help='Output file for analysis results')
 def analyze(source_dir, output):
     """Analyze application source code (Smart Mode)."""
+    from .learning_layer import KnowledgeBase
+    from .utils import SourceAnalyzer, json_io
+    
     console.print(f"[blue]Analyzing source:[/blue] {source_dir}")
     
     try:
@@ -194,20 +284,16 @@ def analyze(source_dir, output):
         # Save to file if requested
         if output:
             output_path = Path(output)
-            with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2)
+            json_io.dump_file(output_path, results, indent=True)
             console.print(f"\n[green]✓ Results saved to:[/green] {output_path}")
         
         # Update knowledge base
         kb = KnowledgeBase()
-        for test_id in results['test_ids']:
-            kb.add_element_mapping(
-                test_id['id'],
-                test_id['selector'],
-                selector_type='testid'
+        with kb:
+            kb.add_element_mappings_bulk(
+                (test_id['id'], test_id['selector'], 'testid') for test_id in results['test_ids']
             )
-        for route in results['routes']:
-            kb.add_route(route)
+            kb.add_routes_bulk(results['routes'])
         
         console.print("\n[green]✓ Knowledge base updated[/green]")
         
@@ -218,6 +304,8 @@ def analyze(source_dir, output):
 @cli.command()
 def patterns():
     """Show learned patterns."""
+    from .learning_layer import PatternLearner
+    
     learner = PatternLearner()
     common_patterns = learner.get_common_patterns(min_count=1)
     
@@ -225,18 +313,23 @@ def patterns():
         console.print("[yellow]No patterns learned yet.[/yellow]")
         return
     
-    console.print("[bold]Learned Patterns[/bold]\n")
-    
+    # Render everything in one print instead of a write per line
+    lines = ["[bold]Learned Patterns[/bold]\n"]
     for pattern in common_patterns[:10]:
-        console.print(f"[cyan]{pattern['pattern']}[/cyan]")
-        console.print(f"  Count: {pattern['count']}")
-        console.print(f"  Examples: {', '.join(pattern['examples'][:3])}")
-        console.print()
+        lines += [
+            f"[cyan]{pattern['pattern']}[/cyan]",
+            f"  Count: {pattern['count']}",
+            f"  Examples: {', '.join(pattern['examples'][:3])}",
+            ""
+        ]
+    console.print(Group(*lines))
 
 
 @cli.command()
 def knowledge():
     """Show knowledge base contents."""
+    from .learning_layer import KnowledgeBase
+    
     kb = KnowledgeBase()
     catalog = kb.export_catalog()
     
@@ -248,11 +341,50 @@ def knowledge():
     console.print(f"API endpoints: {catalog['stats']['total_endpoints']}")
     
     if catalog['element_mappings']:
-        console.print("\n[cyan]Sample Element Mappings:[/cyan]")
+        lines = ["\n[cyan]Sample Element Mappings:[/cyan]"]
         for name, mapping in list(catalog['element_mappings'].items())[:5]:
             selectors = mapping.get('selectors', [])
             if selectors:
-                console.print(f"  {name}: {selectors[0]['value']}")
+                lines.append(f"  {name}: {selectors[0]['value']}")
+        console.print(Group(*lines))
+
+
+async def _explore_click(controller: "PlaywrightController", parts: List[str]):
+    """Handle 'click <selector>'."""
+    from .models.action import Action, ActionType
+    result = await controller.execute_action(Action(type=ActionType.CLICK, selector=parts[1]))
+    if result['success']:
+        console.print("[green]✓ Clicked[/green]")
+    else:
+        console.print(f"[red]✗ {result.get('error')}[/red]")
+
+
+async def _explore_type(controller: "PlaywrightController", parts: List[str]):
+    """Handle 'type <selector> <text>'."""
+    from .models.action import Action, ActionType
+    result = await controller.execute_action(Action(type=ActionType.TYPE, selector=parts[1], value=parts[2]))
+    if result['success']:
+        console.print("[green]✓ Typed[/green]")
+    else:
+        console.print(f"[red]✗ {result.get('error')}[/red]")
+
+
+async def _explore_screenshot(controller: "PlaywrightController", parts: List[str]):
+    """Handle 'screenshot'."""
+    from .models.action import Action, ActionType
+    result = await controller.execute_action(Action(type=ActionType.SCREENSHOT))
+    if result['success']:
+        console.print(f"[green]✓ Screenshot saved:[/green] {result['metadata']['screenshot_path']}")
+    else:
+        console.print(f"[red]✗ {result.get('error')}[/red]")
+
+
+# explore command -> (minimum number of words, handler)
+_EXPLORE_HANDLERS = {
+    'click': (2, _explore_click),
+    'type': (3, _explore_type),
+    'screenshot': (1, _explore_screenshot),
+}
 
 
 @cli.command()
@@ -260,13 +392,14 @@ def knowledge():
 @click.option('--headless/--headed', default=False, help='Browser mode')
 def explore(url, headless):
     """Interactively explore a website."""
+    from .browser_control import PlaywrightController
+    
     console.print(f"[blue]Opening:[/blue] {url}")
     console.print("[yellow]Interactive exploration mode[/yellow]")
     console.print("Commands: click <selector>, type <selector> <text>, screenshot, done")
     
     async def run_exploration():
-        controller = PlaywrightController(headless=headless)
-        await controller.start()
+        controller = await PlaywrightController.get_shared(headless=headless)
         
         try:
             # Navigate to URL
@@ -286,33 +419,9 @@ def explore(url, headless):
                 action_type = parts[0].lower()
                 
                 try:
-                    if action_type == 'click' and len(parts) >= 2:
-                        selector = parts[1]
-                        action = Action(type=ActionType.CLICK, selector=selector)
-                        result = await controller.execute_action(action)
-                        if result['success']:
-                            console.print("[green]✓ Clicked[/green]")
-                        else:
-                            console.print(f"[red]✗ {result.get('error')}[/red]")
-                    
-                    elif action_type == 'type' and len(parts) >= 3:
-                        selector = parts[1]
-                        value = parts[2]
-                        action = Action(type=ActionType.TYPE, selector=selector, value=value)
-                        result = await controller.execute_action(action)
-                        if result['success']:
-                            console.print("[green]✓ Typed[/green]")
-                        else:
-                            console.print(f"[red]✗ {result.get('error')}[/red]")
-                    
-                    elif action_type == 'screenshot':
-                        action = Action(type=ActionType.SCREENSHOT)
-                        result = await controller.execute_action(action)
-                        if result['success']:
-                            console.print(f"[green]✓ Screenshot saved:[/green] {result['metadata']['screenshot_path']}")
-                        else:
-                            console.print(f"[red]✗ {result.get('error')}[/red]")
-                    
+                    entry = _EXPLORE_HANDLERS.get(action_type)
+                    if entry and len(parts) >= entry[0]:
+                        await entry[1](controller, parts)
                     else:
                         console.print("[yellow]Unknown command[/yellow]")
                 
@@ -320,9 +429,10 @@ def explore(url, headless):
                     console.print(f"[red]Error:[/red] {str(e)}")
         
         finally:
+            # Closes only this session's context; the browser stays pooled
             await controller.stop()
     
-    asyncio.run(run_exploration())
+    _run(run_exploration())
 
 
 def main():
@@ -2,7 +2,7 @@
 
 from enum import Enum
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ActionType(str, Enum):
@@ -20,7 +20,9 @@ class ActionType(str, Enum):
 
 
 class Action(BaseModel):
-    """Represents a single browser action."""
+    """Represents a single browser action; instances are immutable."""
+    
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
     
     type: ActionType = Field(..., description="Type of action to perform")
     selector: Optional[str] = Field(None, description="CSS selector or XPath for element")
@@ -28,6 +30,3 @@ class Action(BaseModel):
     text: Optional[str] = Field(None, description="Text to verify or extract")
     timeout: int = Field(default=30000, description="Timeout in milliseconds")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional action metadata")
-    
-    class Config:
-        use_enum_values = True
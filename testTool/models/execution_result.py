@@ -12,7 +12,7 @@ class StepResult(BaseModel):
     success: bool = Field(..., description="Whether step succeeded")
     error: Optional[str] = Field(None, description="Error message if failed")
     screenshot_path: Optional[str] = Field(None, description="Path to screenshot")
-    dom_snapshot: Optional[str] = Field(None, description="DOM snapshot hash")
+    dom_snapshot: Optional[str] = Field(None, description="DOM fingerprint, or non-cryptographic content hash when verifying")
     duration_ms: float = Field(..., description="Execution duration in milliseconds")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional result data")
 
@@ -25,8 +25,3 @@ class ExecutionResult(BaseModel):
     step_results: List[StepResult] = Field(default_factory=list, description="Results for each step")
     total_duration_ms: float = Field(..., description="Total execution duration")
     executed_at: datetime = Field(default_factory=datetime.now, description="Execution timestamp")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
@@ -2,12 +2,14 @@
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from .action import Action
 
 
 class TestStep(BaseModel):
-    """A single step in a test script."""
+    """A single step in a test script; instances are immutable."""
+    
+    model_config = ConfigDict(frozen=True)
     
     description: str = Field(..., description="Human-readable description of the step")
     action: Action = Field(..., description="The action to perform")
@@ -24,8 +26,3 @@ class TestScript(BaseModel):
     steps: List[TestStep] = Field(default_factory=list, description="Test steps")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Script metadata")
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
@@ -1,11 +1,120 @@
 """Natural language interpreter for converting human instructions to actions."""
 
+import asyncio
 import json
 import os
-from typing import List, Optional, Dict, Any
+import re
+import threading
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any, Tuple
 from ..models.action import Action, ActionType
 
 
+_URL_RE = re.compile(r'https?://[^\s\'"]+(?=[\'"\s]|$)')
+_QUOTE_RE = re.compile(r'["\']([^"\']+)["\']')
+
+# Actions that can't run without a target element
+_SELECTOR_REQUIRED = frozenset({
+    ActionType.CLICK,
+    ActionType.TYPE,
+    ActionType.SELECT,
+    ActionType.SCROLL,
+})
+
+# Catch-all action for instructions no rule matched. Built without validation,
+# so the type is stored as the plain value, as use_enum_values would
+_FALLBACK_TEMPLATE = Action.model_construct(type=ActionType.CLICK.value, selector="*")
+
+# Common element identifiers
+_ELEMENT_MAP = {
+    "login": "button[data-testid='login'], #login, .login-btn",
+    "submit": "button[type='submit'], input[type='submit']",
+    "username": "input[name='username'], #username",
+    "password": "input[name='password'], #password",
+    "email": "input[type='email'], input[name='email']",
+}
+
+# First (preferred) selector for each identifier
+_ELEMENT_SELECTORS = {
+    keyword: selectors.split(',')[0].strip() for keyword, selectors in _ELEMENT_MAP.items()
+}
+
+# Finds every identifier occurrence (overlapping ones included) in one scan
+_ELEMENT_RE = re.compile("(?=(" + "|".join(map(re.escape, _ELEMENT_SELECTORS)) + "))")
+
+
+class _ActionStreamParser:
+    """
+    Incrementally extracts action objects from a streamed LLM response.
+    
+    The response is either a JSON array of actions or an object holding one
+    under "actions". Each array element is decoded as soon as its closing
+    brace arrives, so callers can act on it while the rest still streams.
+    A complete object without "actions" holds no actions, as in interpret().
+    """
+    
+    _decoder = json.JSONDecoder()
+    
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self._buffer = ""
+        self._pos = -1  # Index of the next array element once the array opened
+        self.done = False
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of the response.
+        
+        Args:
+            text: Next chunk of response text
+        
+        Returns:
+            Action dictionaries completed by this chunk
+        """
+        self._buffer += text
+        buffer = self._buffer
+        
+        if self._pos < 0:
+            stripped = buffer.lstrip()
+            if not stripped:
+                return []
+            key = 0 if stripped[0] == "[" else buffer.find('"actions"')
+            start = buffer.find("[", key) if key >= 0 else -1
+            if start < 0:
+                if key < 0 and "}" in text:
+                    self.done = self._is_complete_object(stripped)
+                return []
+            self._pos = start + 1
+        elif "}" not in text and "]" not in text:
+            # Nothing can have completed without a closing bracket
+            return []
+        
+        items = []
+        while not self.done:
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, self._pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element is still streaming
+                break
+            items.append(item)
+        return items
+    
+    def _is_complete_object(self, text: str) -> bool:
+        """Whether text is an entire JSON object, so no "actions" key will follow."""
+        try:
+            value, end = self._decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            return False
+        return isinstance(value, dict) and not text[end:].strip()
+
+
 class NLInterpreter:
     """
     Interprets natural language instructions and converts them to structured actions.
@@ -25,6 +134,18 @@ class NLInterpreter:
         self.llm_provider = llm_provider
         self._client = None
         
+        # Leading verb -> rule handler
+        navigate, click, type_, select = self._rule_navigate, self._rule_click, self._rule_type, self._rule_select
+        self._verb_dispatch = {
+            "go": navigate, "navigate": navigate, "open": navigate, "visit": navigate,
+            "click": click, "press": click, "tap": click,
+            "type": type_, "enter": type_, "input": type_, "fill": type_,
+            "select": select,
+            "wait": self._rule_wait,
+            "screenshot": self._rule_screenshot, "capture": self._rule_screenshot,
+            "verify": self._rule_assert, "assert": self._rule_assert, "check": self._rule_assert,
+        }
+        
         if use_llm:
             self._init_llm_client()
     
@@ -54,17 +175,54 @@ class NLInterpreter:
         Args:
             instruction: Natural language instruction
             context: Optional context (DOM state, previous actions, etc.)
-            
+        
         Returns:
-            List of Action objects
+            List of Action objects (empty for a blank instruction)
         """
+        if not instruction or instruction.isspace():
+            return []
+        
         if self.use_llm and self._client:
             return self._interpret_with_llm(instruction, context)
         else:
             return self._interpret_with_rules(instruction, context)
     
-    def _interpret_with_llm(self, instruction: str, context: Optional[Dict[str, Any]]) -> List[Action]:
-        """Use LLM to interpret instruction."""
+    async def interpret_many(
+        self,
+        instructions: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 8
+    ) -> List[List[Action]]:
+        """
+        Interpret several instructions, overlapping LLM requests.
+        
+        In LLM mode up to max_concurrency requests are in flight at once;
+        rule-based interpretation is cheap and runs inline.
+        
+        Args:
+            instructions: Natural language instructions
+            context: Optional context shared by all instructions
+            max_concurrency: Maximum concurrent LLM requests
+        
+        Returns:
+            A list of actions per instruction, in the same order
+        """
+        if not (self.use_llm and self._client):
+            return [self.interpret(instruction, context) for instruction in instructions]
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(instruction: str) -> List[Action]:
+            if not instruction or instruction.isspace():
+                return []
+            async with semaphore:
+                # The LLM clients are synchronous; keep the blocking call off the loop
+                return await asyncio.to_thread(self._interpret_with_llm, instruction, context)
+        
+        return list(await asyncio.gather(*(run(instruction) for instruction in instructions)))
+    
+    def _llm_prompts(self, instruction: str, context: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        """Build the (system, user) prompts for an instruction."""
         system_prompt = """You are a browser automation expert. Convert natural language instructions 
         into structured browser actions. Return a JSON array of actions with this schema:
         {
@@ -87,6 +245,12 @@ class NLInterpreter:
         if context:
             user_prompt += f"\n\nContext: {json.dumps(context, indent=2)}"
         
+        return system_prompt, user_prompt
+    
+    def _interpret_with_llm(self, instruction: str, context: Optional[Dict[str, Any]]) -> List[Action]:
+        """Use LLM to interpret instruction."""
+        system_prompt, user_prompt = self._llm_prompts(instruction, context)
+        
         try:
             if self.llm_provider == "openai":
                 response = self._client.chat.completions.create(
@@ -100,7 +264,7 @@ class NLInterpreter:
                 )
                 result = json.loads(response.choices[0].message.content)
                 actions_data = result.get("actions", [])
-                
+            
             elif self.llm_provider == "anthropic":
                 response = self._client.messages.create(
                     model="claude-3-opus-20240229",
@@ -114,80 +278,219 @@ class NLInterpreter:
                 actions_data = result.get("actions", [])
             
             return [Action(**action_data) for action_data in actions_data]
-            
+        
         except Exception as e:
             print(f"LLM interpretation failed: {e}. Falling back to rule-based.")
             return self._interpret_with_rules(instruction, context)
     
+    async def interpret_stream(
+        self,
+        instruction: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Action]:
+        """
+        Interpret an instruction, yielding actions as they become available.
+        
+        In LLM mode the completion is streamed and each action is yielded as
+        soon as it has been fully generated, so the first one arrives long
+        before the response is complete. Rule-based interpretation yields
+        all actions at once.
+        
+        Args:
+            instruction: Natural language instruction
+            context: Optional context (DOM state, previous actions, etc.)
+        
+        Yields:
+            Action objects, in order
+        """
+        if not (self.use_llm and self._client) or not instruction or instruction.isspace():
+            for action in self.interpret(instruction, context):
+                yield action
+            return
+        
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def produce():
+            # The LLM clients are synchronous; stream on a worker thread
+            try:
+                for text in self._stream_llm_text(instruction, context):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(chunks.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+        
+        producer = asyncio.ensure_future(asyncio.to_thread(produce))
+        parser = _ActionStreamParser()
+        yielded = False
+        error: Optional[Exception] = None
+        
+        try:
+            while (chunk := await chunks.get()) is not None:
+                if error is not None:
+                    continue
+                if isinstance(chunk, Exception):
+                    error = chunk
+                    continue
+                try:
+                    actions = [Action(**data) for data in parser.feed(chunk)]
+                except Exception as e:
+                    error = e
+                    stop.set()
+                    continue
+                for action in actions:
+                    yielded = True
+                    yield action
+        finally:
+            stop.set()
+            await producer
+        
+        if error is None and not parser.done:
+            error = ValueError("incomplete JSON response")
+        if error is not None:
+            if yielded:
+                print(f"LLM interpretation stopped early: {error}")
+            else:
+                print(f"LLM interpretation failed: {error}. Falling back to rule-based.")
+                for action in self._interpret_with_rules(instruction, context):
+                    yield action
+    
+    def _stream_llm_text(self, instruction: str, context: Optional[Dict[str, Any]]) -> Iterator[str]:
+        """Request an interpretation and yield the response text as it streams."""
+        system_prompt, user_prompt = self._llm_prompts(instruction, context)
+        
+        if self.llm_provider == "openai":
+            stream = self._client.chat.completions.create(
+                model="gpt-4-turbo-preview",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        
+        elif self.llm_provider == "anthropic":
+            with self._client.messages.stream(
+                model="claude-3-opus-20240229",
+                max_tokens=2000,
+                temperature=0.1,
+                messages=[
+                    {"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}
+                ]
+            ) as stream:
+                yield from stream.text_stream
+    
     def _interpret_with_rules(self, instruction: str, context: Optional[Dict[str, Any]]) -> List[Action]:
         """Use rule-based interpretation as fallback."""
         instruction_lower = instruction.lower().strip()
-        actions = []
         
+        # Most instructions lead with their verb: dispatch on it directly
+        words = instruction_lower.split(None, 1)
+        handler = self._verb_dispatch.get(words[0]) if words else None
+        actions = handler(instruction, instruction_lower) if handler else []
+        
+        # Otherwise look for the keywords anywhere in the instruction
+        if not actions:
+            actions = self._scan_keywords(instruction, instruction_lower)
+        
+        # Default: try to extract as click action
+        if not actions:
+            actions.append(_FALLBACK_TEMPLATE.model_copy(update={"metadata": {"raw_instruction": instruction}}))
+        
+        return actions
+    
+    def _scan_keywords(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Match rule keywords anywhere in the instruction, in priority order."""
         # Navigation patterns
         if any(keyword in instruction_lower for keyword in ["go to", "navigate to", "open", "visit"]):
-            url = self._extract_url(instruction)
-            if url:
-                actions.append(Action(type=ActionType.NAVIGATE, value=url))
+            return self._rule_navigate(instruction, instruction_lower)
         
         # Click patterns
-        elif any(keyword in instruction_lower for keyword in ["click", "press", "tap"]):
-            selector = self._extract_selector(instruction, "button")
-            actions.append(Action(type=ActionType.CLICK, selector=selector))
+        if any(keyword in instruction_lower for keyword in ["click", "press", "tap"]):
+            return self._rule_click(instruction, instruction_lower)
         
         # Type/input patterns
-        elif any(keyword in instruction_lower for keyword in ["type", "enter", "input", "fill"]):
-            value = self._extract_value(instruction)
-            selector = self._extract_selector(instruction, "input")
-            actions.append(Action(type=ActionType.TYPE, selector=selector, value=value))
+        if any(keyword in instruction_lower for keyword in ["type", "enter", "input", "fill"]):
+            return self._rule_type(instruction, instruction_lower)
         
         # Select patterns
-        elif "select" in instruction_lower:
-            value = self._extract_value(instruction)
-            selector = self._extract_selector(instruction, "select")
-            actions.append(Action(type=ActionType.SELECT, selector=selector, value=value))
+        if "select" in instruction_lower:
+            return self._rule_select(instruction, instruction_lower)
         
         # Wait patterns
-        elif "wait" in instruction_lower:
-            wait_type = "load"
-            if "network" in instruction_lower:
-                wait_type = "networkidle"
-            actions.append(Action(type=ActionType.WAIT, value=wait_type))
+        if "wait" in instruction_lower:
+            return self._rule_wait(instruction, instruction_lower)
         
         # Screenshot patterns
-        elif "screenshot" in instruction_lower or "capture" in instruction_lower:
-            actions.append(Action(type=ActionType.SCREENSHOT))
+        if "screenshot" in instruction_lower or "capture" in instruction_lower:
+            return self._rule_screenshot(instruction, instruction_lower)
         
         # Assertion patterns
-        elif any(keyword in instruction_lower for keyword in ["verify", "assert", "check"]):
-            text = self._extract_value(instruction)
-            selector = self._extract_selector(instruction, "*")
-            if "text" in instruction_lower:
-                actions.append(Action(type=ActionType.ASSERT_TEXT, selector=selector, text=text))
-            else:
-                actions.append(Action(type=ActionType.ASSERT_ELEMENT, selector=selector))
+        if any(keyword in instruction_lower for keyword in ["verify", "assert", "check"]):
+            return self._rule_assert(instruction, instruction_lower)
         
-        # Default: try to extract as click action
-        if not actions:
-            actions.append(Action(
-                type=ActionType.CLICK,
-                selector="*",
-                metadata={"raw_instruction": instruction}
-            ))
-        
-        return actions
+        return []
+    
+    def _rule_navigate(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Navigate to the URL in the instruction, if there is one."""
+        url = self._extract_url(instruction)
+        if url:
+            return [Action(type=ActionType.NAVIGATE, value=url)]
+        return []
+    
+    def _rule_click(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Click the described element."""
+        selector = self._extract_selector(instruction, "button", instruction_lower)
+        return [Action(type=ActionType.CLICK, selector=selector)]
+    
+    def _rule_type(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Type the quoted value into the described input."""
+        value = self._extract_value(instruction)
+        selector = self._extract_selector(instruction, "input", instruction_lower)
+        return [Action(type=ActionType.TYPE, selector=selector, value=value)]
+    
+    def _rule_select(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Select the quoted option in the described dropdown."""
+        value = self._extract_value(instruction)
+        selector = self._extract_selector(instruction, "select", instruction_lower)
+        return [Action(type=ActionType.SELECT, selector=selector, value=value)]
+    
+    def _rule_wait(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Wait for the page load or network idle."""
+        wait_type = "load"
+        if "network" in instruction_lower:
+            wait_type = "networkidle"
+        return [Action(type=ActionType.WAIT, value=wait_type)]
+    
+    def _rule_screenshot(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Take a screenshot."""
+        return [Action(type=ActionType.SCREENSHOT)]
+    
+    def _rule_assert(self, instruction: str, instruction_lower: str) -> List[Action]:
+        """Assert the described element exists or contains the quoted text."""
+        text = self._extract_value(instruction)
+        selector = self._extract_selector(instruction, "*", instruction_lower)
+        if "text" in instruction_lower:
+            return [Action(type=ActionType.ASSERT_TEXT, selector=selector, text=text)]
+        return [Action(type=ActionType.ASSERT_ELEMENT, selector=selector)]
     
     def _extract_url(self, instruction: str) -> Optional[str]:
         """Extract URL from instruction."""
-        import re
-        url_pattern = r'https?://[^\s\'"]+(?=[\'"\s]|$)'
-        match = re.search(url_pattern, instruction)
+        match = _URL_RE.search(instruction)
         if match:
             return match.group(0)
         
         # Try to extract from quotes
-        quote_pattern = r'["\']([^"\']+)["\']'
-        match = re.search(quote_pattern, instruction)
+        match = _QUOTE_RE.search(instruction)
         if match:
             potential_url = match.group(1)
             if potential_url.startswith('http'):
@@ -197,34 +500,30 @@ class NLInterpreter:
     
     def _extract_value(self, instruction: str) -> str:
         """Extract value from instruction (text in quotes)."""
-        import re
-        quote_pattern = r'["\']([^"\']+)["\']'
-        match = re.search(quote_pattern, instruction)
+        match = _QUOTE_RE.search(instruction)
         if match:
             return match.group(1)
         return ""
     
-    def _extract_selector(self, instruction: str, default_element: str) -> str:
-        """Extract or generate selector from instruction."""
-        instruction_lower = instruction.lower()
-        
-        # Common element identifiers
-        element_map = {
-            "login": "button[data-testid='login'], #login, .login-btn",
-            "submit": "button[type='submit'], input[type='submit']",
-            "username": "input[name='username'], #username",
-            "password": "input[name='password'], #password",
-            "email": "input[type='email'], input[name='email']",
-        }
+    def _extract_selector(
+        self,
+        instruction: str,
+        default_element: str,
+        instruction_lower: Optional[str] = None
+    ) -> str:
+        """Extract or generate selector from instruction (lowercased by the caller if already available)."""
+        if instruction_lower is None:
+            instruction_lower = instruction.lower()
         
-        for keyword, selector in element_map.items():
-            if keyword in instruction_lower:
-                return selector.split(',')[0].strip()
+        found = {match.group(1) for match in _ELEMENT_RE.finditer(instruction_lower)}
+        if found:
+            # Earlier identifiers in the map take priority, wherever they appear
+            for keyword, selector in _ELEMENT_SELECTORS.items():
+                if keyword in found:
+                    return selector
         
         # Try to extract from quotes
-        import re
-        quote_pattern = r'["\']([^"\']+)["\']'
-        match = re.search(quote_pattern, instruction)
+        match = _QUOTE_RE.search(instruction)
         if match:
             text = match.group(1)
             return f"{default_element}:has-text('{text}')"
@@ -241,7 +540,7 @@ class NLInterpreter:
         issues = []
         
         for i, action in enumerate(actions):
-            if action.type in [ActionType.CLICK, ActionType.TYPE, ActionType.SELECT, ActionType.SCROLL]:
+            if action.type in _SELECTOR_REQUIRED:
                 if not action.selector:
                     issues.append(f"Action {i}: {action.type} requires a selector")
             
@@ -1,10 +1,27 @@
 """Script storage for saving and loading test scripts."""
 
-import json
-import yaml
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
-from ..models.test_script import TestScript
+from typing import Any, Dict, Iterable, List, Optional
+from ..models.action import Action
+from ..models.test_script import TestScript, TestStep
+from ..utils import json_io
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Characters dropped from script names to build filenames: anything but
+# alphanumerics, spaces, hyphens and underscores
+_UNSAFE_RE = re.compile(r'[^\w\- ]+')
+
+# File extension per storage format
+EXTENSIONS = {"json": ".json", "yaml": ".yaml", "msgpack": ".msgpack"}
 
 
 class ScriptStorage:
@@ -14,9 +31,21 @@ class ScriptStorage:
     Supports multiple formats:
     - JSON (default)
     - YAML
+    - MessagePack (compact binary; requires the msgpack package)
     - Custom DSL (future)
+    
+    A small metadata index (``.index.json``) summarizes every stored script
+    so they can be listed without parsing each file. Saves and deletes only
+    append a line per file to a journal (``.index.log``), which is folded
+    into the index by list_metadata() or once it grows past
+    ``INDEX_COMPACT_THRESHOLD`` bytes, so a save costs the same however
+    many scripts are stored.
     """
     
+    INDEX_FILE = ".index.json"
+    INDEX_JOURNAL = ".index.log"
+    INDEX_COMPACT_THRESHOLD = 1 << 20
+    
     def __init__(self, storage_dir: str = "./test_scripts"):
         """
         Initialize script storage.
@@ -33,66 +62,134 @@ class ScriptStorage:
         
         Args:
             script: The test script to save
-            format: Storage format ('json' or 'yaml')
+            format: Storage format ('json', 'yaml' or 'msgpack')
             
         Returns:
             Path to saved script file
         """
-        # Sanitize filename
-        safe_name = "".join(c for c in script.name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = safe_name.replace(' ', '_').lower()
+        return self.save_formats(script, [format])[0]
+    
+    def save_formats(self, script: TestScript, formats: Iterable[str]) -> List[Path]:
+        """
+        Save a test script in several formats, dumping the model only once.
         
-        if format == "json":
-            filename = f"{safe_name}.json"
-            filepath = self.storage_dir / filename
-            
-            with open(filepath, 'w') as f:
-                json.dump(script.model_dump(), f, indent=2, default=str)
-                
-        elif format == "yaml":
-            filename = f"{safe_name}.yaml"
-            filepath = self.storage_dir / filename
+        Args:
+            script: The test script to save
+            formats: Storage formats ('json', 'yaml' or 'msgpack')
             
-            with open(filepath, 'w') as f:
-                yaml.dump(script.model_dump(), f, default_flow_style=False, sort_keys=False)
+        Returns:
+            Paths to the saved script files, in the order of formats
+        """
+        formats = list(formats)
+        for format in formats:
+            if format not in EXTENSIONS:
+                raise ValueError(f"Unsupported format: {format}")
+        if "msgpack" in formats:
+            _require_msgpack()
         
-        else:
+        safe_name = _safe_name(script.name)
+        
+        data = script.model_dump(mode="json")
+        
+        filepaths = []
+        entries = []
+        for format in formats:
+            filepath = self.storage_dir / f"{safe_name}{EXTENSIONS[format]}"
+            filepath.write_bytes(_encode(data, format))
+            entries.append({
+                "file": filepath.name,
+                "metadata": _metadata(script, format, filepath.stat().st_mtime_ns)
+            })
+            filepaths.append(filepath)
+        
+        self._append_index(entries)
+        return filepaths
+    
+    def save_many(
+        self,
+        scripts: Iterable[TestScript],
+        format: str = "json",
+        fsync: bool = False
+    ) -> List[Path]:
+        """
+        Save many test scripts, updating the metadata index once.
+        
+        Args:
+            scripts: The test scripts to save
+            format: Storage format ('json', 'yaml' or 'msgpack')
+            fsync: Make the files durable before returning: each file's data
+                is synced as it is written, then the directory once at the end
+            
+        Returns:
+            Paths to the saved script files, in the order of scripts
+        """
+        if format not in EXTENSIONS:
             raise ValueError(f"Unsupported format: {format}")
+        if format == "msgpack":
+            _require_msgpack()
         
-        return filepath
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        entries = []
+        filepaths = []
+        
+        for script in scripts:
+            filepath = self.storage_dir / f"{_safe_name(script.name)}{EXTENSIONS[format]}"
+            data = memoryview(_encode(script.model_dump(mode="json"), format))
+            
+            # Unbuffered writes: the encoded file is already one buffer
+            fd = os.open(filepath, flags, 0o666)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+                if fsync:
+                    os.fsync(fd)
+                mtime = os.fstat(fd).st_mtime_ns
+            finally:
+                os.close(fd)
+            
+            entries.append({"file": filepath.name, "metadata": _metadata(script, format, mtime)})
+            filepaths.append(filepath)
+        
+        self._append_index(entries)
+        if fsync:
+            self._fsync_dir()
+        return filepaths
     
-    def load(self, name: str, format: str = "json") -> TestScript:
+    def load(self, name: str, format: str = "json", trusted: bool = False) -> TestScript:
         """
         Load a test script from storage.
         
         Args:
             name: Script name or filename
-            format: Storage format ('json' or 'yaml')
+            format: Storage format ('json', 'yaml' or 'msgpack')
+            trusted: Skip validation, for files known to have been written
+                by save(); malformed data then surfaces only when used
             
         Returns:
             The loaded TestScript
         """
         # Try to find the file
-        if format == "json":
-            filepath = self.storage_dir / f"{name}.json"
-            if not filepath.exists():
-                filepath = self.storage_dir / name
-        elif format == "yaml":
-            filepath = self.storage_dir / f"{name}.yaml"
-            if not filepath.exists():
-                filepath = self.storage_dir / name
-        else:
+        if format not in EXTENSIONS:
             raise ValueError(f"Unsupported format: {format}")
+        filepath = self.storage_dir / f"{name}{EXTENSIONS[format]}"
+        if not filepath.exists():
+            filepath = self.storage_dir / name
         
         if not filepath.exists():
             raise FileNotFoundError(f"Script not found: {name}")
         
-        with open(filepath, 'r') as f:
-            if format == "json":
-                data = json.load(f)
-            elif format == "yaml":
-                data = yaml.safe_load(f)
+        if format == "msgpack":
+            _require_msgpack()
+            data = msgpack.unpackb(filepath.read_bytes())
+        elif format == "json":
+            data = json_io.load_file(filepath)
+        else:
+            yaml, _, loader = _yaml()
+            with open(filepath, 'r') as f:
+                data = yaml.load(f, Loader=loader)
         
+        if trusted:
+            return _construct_script(data)
         return TestScript(**data)
     
     def list_scripts(self) -> List[str]:
@@ -102,17 +199,57 @@ class ScriptStorage:
         Returns:
             List of script names
         """
-        scripts = []
-        
-        for filepath in self.storage_dir.glob("*.json"):
-            scripts.append(filepath.stem)
+        suffixes = tuple(EXTENSIONS.values())
+        scripts = set()
         
-        for filepath in self.storage_dir.glob("*.yaml"):
-            if filepath.stem not in scripts:  # Avoid duplicates
-                scripts.append(filepath.stem)
+        # One directory read for every format; a set drops cross-format duplicates
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffixes) and not entry.name.startswith('.'):
+                    scripts.add(os.path.splitext(entry.name)[0])
         
         return sorted(scripts)
     
+    def list_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize all stored scripts without loading them.
+        
+        Summaries come from the index; only script files that are new or
+        were modified since they were indexed are parsed.
+        
+        Returns:
+            Mapping of file name to its script's name, format, description,
+            step count and file mtime
+        """
+        formats = {ext: format for format, ext in EXTENSIONS.items()}
+        index = self._read_index()
+        current = {}
+        changed = False
+        
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                format = formats.get(os.path.splitext(entry.name)[1])
+                if format is None or entry.name.startswith('.'):
+                    continue
+                
+                mtime = entry.stat().st_mtime_ns
+                metadata = index.get(entry.name)
+                if metadata is None or metadata.get("mtime") != mtime:
+                    try:
+                        script = self.load(entry.name, format=format)
+                    except Exception:
+                        # Not a readable script; leave it out
+                        continue
+                    metadata = _metadata(script, format, mtime)
+                    changed = True
+                current[entry.name] = metadata
+        
+        journal = self.storage_dir / self.INDEX_JOURNAL
+        if changed or len(current) != len(index) or journal.exists():
+            self._write_index(current)
+        
+        return current
+    
     def delete(self, name: str) -> bool:
         """
         Delete a test script.
@@ -124,12 +261,20 @@ class ScriptStorage:
             True if deleted, False if not found
         """
         deleted = False
+        base = os.path.join(self.storage_dir, name)
+        
+        # Just try to unlink; a missing file costs no more than a stat would
+        for ext in EXTENSIONS.values():
+            try:
+                os.unlink(base + ext)
+            except FileNotFoundError:
+                continue
+            deleted = True
         
-        for ext in ['.json', '.yaml']:
-            filepath = self.storage_dir / f"{name}{ext}"
-            if filepath.exists():
-                filepath.unlink()
-                deleted = True
+        if deleted:
+            self._append_index([
+                {"file": f"{name}{ext}", "metadata": None} for ext in EXTENSIONS.values()
+            ])
         
         return deleted
     
@@ -143,7 +288,132 @@ class ScriptStorage:
         Returns:
             True if script exists
         """
-        return (
-            (self.storage_dir / f"{name}.json").exists() or
-            (self.storage_dir / f"{name}.yaml").exists()
-        )
+        base = os.path.join(self.storage_dir, name)
+        return any(os.path.isfile(base + ext) for ext in EXTENSIONS.values())
+    
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read the metadata index with its journal replayed on top."""
+        try:
+            index = json_io.load_file(self.storage_dir / self.INDEX_FILE)
+        except (OSError, ValueError):
+            index = {}
+        if not isinstance(index, dict):
+            index = {}
+        
+        try:
+            with open(self.storage_dir / self.INDEX_JOURNAL, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json_io.loads(line)
+                    except ValueError:
+                        # A torn trailing line from an interrupted write
+                        continue
+                    if entry.get("metadata") is None:
+                        index.pop(entry.get("file"), None)
+                    else:
+                        index[entry["file"]] = entry["metadata"]
+        except OSError:
+            pass
+        return index
+    
+    def _append_index(self, entries: List[Dict[str, Any]]):
+        """
+        Record index changes in the journal with a single append.
+        
+        Args:
+            entries: {"file": name, "metadata": summary} dictionaries, with
+                None metadata for removed files
+        """
+        journal = self.storage_dir / self.INDEX_JOURNAL
+        with open(journal, 'ab') as f:
+            f.write(b"".join(json_io.dumps(entry, indent=False) + b"\n" for entry in entries))
+            size = f.tell()
+        if size > self.INDEX_COMPACT_THRESHOLD:
+            self._write_index(self._read_index())
+    
+    def _fsync_dir(self):
+        """Flush the storage directory's entries to disk."""
+        if os.name == "nt":
+            # Directories can't be opened on Windows; entries are durable with their files
+            return
+        fd = os.open(self.storage_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _write_index(self, index: Dict[str, Dict[str, Any]]):
+        """Write the metadata index atomically and truncate the journal."""
+        index_file = self.storage_dir / self.INDEX_FILE
+        tmp_file = index_file.with_suffix(".json.tmp")
+        json_io.dump_file(tmp_file, index, indent=False)
+        os.replace(tmp_file, index_file)
+        (self.storage_dir / self.INDEX_JOURNAL).unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=1024)
+def _safe_name(name: str) -> str:
+    """Sanitize a script name for use as a filename."""
+    return _UNSAFE_RE.sub('', name).rstrip().replace(' ', '_').lower()
+
+
+def _metadata(script: TestScript, format: str, mtime: int) -> Dict[str, Any]:
+    """Build a script's metadata index entry."""
+    return {
+        "name": script.name,
+        "format": format,
+        "description": script.description,
+        "step_count": len(script.steps),
+        "mtime": mtime
+    }
+
+
+def _construct_script(data: Dict[str, Any]) -> TestScript:
+    """Build a TestScript and its steps from dumped data without validation."""
+    steps = [
+        TestStep.model_construct(**{**step, "action": Action.model_construct(**step["action"])})
+        for step in data.get("steps", ())
+    ]
+    
+    # The one field whose dumped form differs from its model type
+    created_at = data.get("created_at")
+    if isinstance(created_at, str):
+        data = {**data, "created_at": datetime.fromisoformat(created_at)}
+    
+    return TestScript.model_construct(**{**data, "steps": steps})
+
+
+def _encode(data: Dict[str, Any], format: str) -> bytes:
+    """Serialize dumped script data in a storage format."""
+    if format == "json":
+        return json_io.dumps(data, indent=True)
+    if format == "yaml":
+        yaml, dumper, _ = _yaml()
+        return yaml.dump(
+            data, Dumper=dumper, default_flow_style=False, sort_keys=False
+        ).encode("utf-8")
+    _require_msgpack()
+    return msgpack.packb(data)
+
+
+@lru_cache(maxsize=None)
+def _yaml():
+    """
+    Import PyYAML on first use, so JSON-only callers don't pay for it.
+    
+    Returns:
+        (yaml module, safe dumper, safe loader), preferring the libyaml C
+        bindings, which are several times faster
+    """
+    import yaml
+    try:
+        from yaml import CSafeDumper as Dumper, CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeDumper as Dumper, SafeLoader as Loader
+    return yaml, Dumper, Loader
+
+
+def _require_msgpack():
+    """Raise a helpful error if the optional msgpack package is missing."""
+    if msgpack is None:
+        raise ImportError("The msgpack format requires the msgpack package (pip install msgpack)")
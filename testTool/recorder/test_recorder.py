@@ -1,7 +1,8 @@
 """Test recorder for capturing browser interactions."""
 
 import time
-from typing import List, Optional, Dict, Any
+from collections import deque
+from typing import Deque, Optional, Dict, Any
 from pathlib import Path
 from ..models.action import Action
 from ..models.test_script import TestScript, TestStep
@@ -31,7 +32,7 @@ class TestRecorder:
         
         self.recording = False
         self.current_script: Optional[TestScript] = None
-        self.recorded_steps: List[TestStep] = []
+        self.recorded_steps: Deque[TestStep] = deque()
         
     def start_recording(self, name: str, description: str, mode: str = "dumb"):
         """
@@ -49,7 +50,7 @@ class TestRecorder:
             mode=mode,
             steps=[]
         )
-        self.recorded_steps = []
+        self.recorded_steps = deque()
         
     def record_step(
         self,
@@ -72,11 +73,13 @@ class TestRecorder:
         if not self.recording:
             raise RuntimeError("Recording not started. Call start_recording() first.")
         
-        # Enhance action metadata with recording context
+        # Enhance action metadata with recording context, on a copy since
+        # actions are immutable and may be shared with the caller
         if metadata:
-            action.metadata.update(metadata)
+            action = action.model_copy(update={"metadata": {**action.metadata, **metadata}})
         
-        step = TestStep(
+        # The arguments are already typed models and values; skip re-validation
+        step = TestStep.model_construct(
             description=description,
             action=action,
             expected_outcome=expected_outcome,
@@ -95,12 +98,12 @@ class TestRecorder:
         if not self.recording:
             raise RuntimeError("No active recording.")
         
-        self.current_script.steps = self.recorded_steps
+        self.current_script.steps = list(self.recorded_steps)
         self.recording = False
         
         script = self.current_script
         self.current_script = None
-        self.recorded_steps = []
+        self.recorded_steps = deque()
         
         return script
     
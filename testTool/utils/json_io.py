@@ -0,0 +1,63 @@
+"""JSON (de)serialization helpers, using orjson when it is installed."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def indent_enabled() -> bool:
+    """Whether pretty-printed output was requested via TESTTOOL_JSON_INDENT."""
+    return os.getenv("TESTTOOL_JSON_INDENT", "") not in ("", "0")
+
+
+def dumps(obj: Any, indent: Optional[bool] = None) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes.
+    
+    Args:
+        obj: Object to serialize; unsupported values are converted with str()
+        indent: Pretty-print with two-space indentation (defaults to
+            indent_enabled())
+    
+    Returns:
+        Encoded JSON
+    """
+    if indent is None:
+        indent = indent_enabled()
+    
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+    
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+        default=str
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_file(path: Union[str, Path], obj: Any, indent: Optional[bool] = None):
+    """Serialize an object to a JSON file."""
+    Path(path).write_bytes(dumps(obj, indent))
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Deserialize a JSON file."""
+    return loads(Path(path).read_bytes())
@@ -1,9 +1,53 @@
 """Source code analyzer for Smart Mode."""
 
+import mmap
 import os
 import re
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple, TypeVar, Union
+
+# Files of each extension, as (absolute path, path relative to the source dir)
+FileIndex = Dict[str, List[Tuple[str, str]]]
+
+T = TypeVar("T")
+
+# File contents as handed to the scanners: bytes, or an mmap for large files
+Buffer = Union[bytes, mmap.mmap]
+
+# data-testid attribute values
+_TEST_ID_RE = re.compile(rb'data-testid=["\']([^"\']+)["\']')
+
+# Common routing patterns, combined so each file is scanned once; exactly one
+# group takes part in each match
+_ROUTE_RE = re.compile(b"|".join([
+    rb'path:\s*["\']([^"\']+)["\']',  # Vue, Angular
+    rb'<Route\s+path=["\']([^"\']+)["\']',  # React Router
+    rb'@app\.route\(["\']([^"\']+)["\']',  # Flask
+    rb'@route\(["\']([^"\']+)["\']',  # FastAPI
+]))
+
+# API endpoint patterns
+_API_RE = re.compile(b"|".join([
+    rb'["\']\/api\/([^"\']+)["\']',
+    rb'fetch\(["\']([^"\']+)["\']',
+    rb'axios\.[a-z]+\(["\']([^"\']+)["\']',
+]))
+
+# Literals every match of a pattern contains. Substring search is far cheaper
+# than a regex scan, so files without any of them skip the scan entirely
+_TEST_ID_LITERALS = (b'data-testid',)
+_ROUTE_LITERALS = (b'path', b'@app.route(', b'@route(')
+_API_LITERALS = (b'/api/', b'fetch(', b'axios.')
+
+# Simple pattern for props in TypeScript/JavaScript; declaration keywords are
+# rejected by the lookahead instead of being filtered afterwards. A str pattern,
+# unlike the others, so \w also matches non-ASCII identifiers
+_PROPS_RE = re.compile(r'\b(?!(?:const|let|var|function|class)\b)(\w+)\s*:\s*\w+[,;]')
+
+# Props reported per component, to avoid noise
+_MAX_PROPS = 10
 
 
 class SourceAnalyzer:
@@ -17,6 +61,35 @@ class SourceAnalyzer:
     - Discover API endpoints
     """
     
+    # File types that may carry data-testid attributes
+    TEST_ID_EXTENSIONS = ('.html', '.jsx', '.tsx', '.vue', '.svelte')
+    
+    # Extensions searched for routes and for API endpoints
+    ROUTE_EXTENSIONS = ('.py', '.js')
+    API_EXTENSIONS = ('.js',)
+    
+    # Files picked up as components by name or by location
+    COMPONENT_SUFFIXES = ('Component.jsx', 'Component.tsx')
+    COMPONENT_DIR = 'components'
+    COMPONENT_DIR_EXTENSIONS = frozenset({'.jsx', '.tsx', '.vue'})
+    
+    # Every extension a finder looks at; other files are left out of the index
+    SCANNED_EXTENSIONS = COMPONENT_DIR_EXTENSIONS.union(
+        TEST_ID_EXTENSIONS, ROUTE_EXTENSIONS, API_EXTENSIONS
+    )
+    
+    # Dependency, VCS, cache and build output directories, never application source
+    SKIP_DIRS = frozenset({
+        'node_modules', '.git', 'venv', '.venv', 'dist', 'build',
+        '__pycache__', '.next', '.nuxt', 'coverage'
+    })
+    
+    # Files at least this large are memory-mapped rather than read
+    MMAP_THRESHOLD = 64 * 1024
+    
+    # Threads used to read and scan files
+    MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    
     def __init__(self, source_dir: str):
         """
         Initialize the source analyzer.
@@ -28,6 +101,13 @@ class SourceAnalyzer:
         
         if not self.source_dir.exists():
             raise ValueError(f"Source directory does not exist: {source_dir}")
+        
+        # Cached file index and the mtimes of the directories it was built from
+        self._file_index: Optional[FileIndex] = None
+        self._dir_mtimes: Dict[str, int] = {}
+        
+        # Scan results per (scanner, file), with the file's (mtime, size) when scanned
+        self._scan_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
     
     def analyze(self) -> Dict[str, Any]:
         """
@@ -36,178 +116,270 @@ class SourceAnalyzer:
         Returns:
             Dictionary with analysis results
         """
+        # Walk the tree once and share the file index between the finders
+        index = self._scan_all()
         return {
-            "test_ids": self.find_test_ids(),
-            "routes": self.find_routes(),
-            "components": self.find_components(),
-            "api_endpoints": self.find_api_endpoints(),
+            "test_ids": self.find_test_ids(_index=index),
+            "routes": self.find_routes(_index=index),
+            "components": self.find_components(_index=index),
+            "api_endpoints": self.find_api_endpoints(_index=index),
         }
     
-    def find_test_ids(self) -> List[Dict[str, str]]:
+    def find_test_ids(self, _index: Optional[FileIndex] = None) -> List[Dict[str, str]]:
         """
         Find all data-testid attributes in source files.
         
         Returns:
             List of test IDs with their locations
         """
-        test_ids = []
+        index = _index if _index is not None else self._scan_all()
+        entries = [entry for ext in self.TEST_ID_EXTENSIONS for entry in index.get(ext, ())]
         
-        # Search in common file types
-        patterns = [
-            '**/*.html',
-            '**/*.jsx',
-            '**/*.tsx',
-            '**/*.vue',
-            '**/*.svelte'
-        ]
-        
-        for pattern in patterns:
-            for filepath in self.source_dir.glob(pattern):
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        
-                        # Find data-testid attributes
-                        matches = re.finditer(r'data-testid=["\']([^"\']+)["\']', content)
-                        for match in matches:
-                            test_ids.append({
-                                "id": match.group(1),
-                                "file": str(filepath.relative_to(self.source_dir)),
-                                "selector": f'[data-testid="{match.group(1)}"]'
-                            })
-                except Exception:
-                    continue
+        test_ids = []
+        for rel_path, ids in self._scan_files(entries, self._extract_test_ids_from_content):
+            for test_id in ids:
+                test_ids.append({
+                    "id": test_id,
+                    "file": rel_path,
+                    "selector": f'[data-testid="{test_id}"]'
+                })
         
         return test_ids
     
-    def find_routes(self) -> List[str]:
+    def find_routes(self, _index: Optional[FileIndex] = None) -> List[str]:
         """
         Find application routes.
         
         Returns:
             List of route paths
         """
-        routes = []
-        
-        # Common routing patterns
-        route_patterns = [
-            r'path:\s*["\']([^"\']+)["\']',  # Vue, Angular
-            r'<Route\s+path=["\']([^"\']+)["\']',  # React Router
-            r'@app\.route\(["\']([^"\']+)["\']',  # Flask
-            r'@route\(["\']([^"\']+)["\']',  # FastAPI
-        ]
+        index = _index if _index is not None else self._scan_all()
+        entries = [entry for ext in self.ROUTE_EXTENSIONS for entry in index.get(ext, ())]
         
-        for filepath in self.source_dir.rglob('*.py'):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for pattern in route_patterns:
-                        matches = re.finditer(pattern, content)
-                        for match in matches:
-                            route = match.group(1)
-                            if route not in routes:
-                                routes.append(route)
-            except Exception:
-                continue
-        
-        for filepath in self.source_dir.rglob('*.js'):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for pattern in route_patterns:
-                        matches = re.finditer(pattern, content)
-                        for match in matches:
-                            route = match.group(1)
-                            if route not in routes:
-                                routes.append(route)
-            except Exception:
-                continue
+        routes = set()
+        for _, found in self._scan_files(entries, self._extract_routes):
+            routes.update(found)
         
         return sorted(routes)
     
-    def find_components(self) -> Dict[str, Any]:
+    def find_components(self, _index: Optional[FileIndex] = None) -> Dict[str, Any]:
         """
         Find UI components and their information.
         
         Returns:
             Dictionary of components
         """
-        components = {}
-        
-        # Search for component files
-        component_patterns = [
-            '**/*Component.jsx',
-            '**/*Component.tsx',
-            '**/components/**/*.jsx',
-            '**/components/**/*.tsx',
-            '**/components/**/*.vue'
+        index = _index if _index is not None else self._scan_all()
+        entries = [
+            entry
+            for ext, ext_entries in index.items()
+            for entry in ext_entries
+            if self._is_component(entry[1], ext)
         ]
         
-        for pattern in component_patterns:
-            for filepath in self.source_dir.glob(pattern):
-                component_name = filepath.stem
-                
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        
-                        # Extract component info
-                        components[component_name] = {
-                            "file": str(filepath.relative_to(self.source_dir)),
-                            "test_ids": self._extract_test_ids_from_content(content),
-                            "props": self._extract_props(content)
-                        }
-                except Exception:
-                    continue
+        components = {}
+        for rel_path, (test_ids, props) in self._scan_files(entries, self._extract_component_info):
+            component_name = os.path.splitext(os.path.basename(rel_path))[0]
+            # Copy the cached lists so callers can't alter the cache
+            components[component_name] = {
+                "file": rel_path,
+                "test_ids": list(test_ids),
+                "props": list(props)
+            }
         
         return components
     
-    def find_api_endpoints(self) -> List[str]:
+    def find_api_endpoints(self, _index: Optional[FileIndex] = None) -> List[str]:
         """
         Find API endpoints in the source.
         
         Returns:
             List of API endpoint paths
         """
-        endpoints = []
+        index = _index if _index is not None else self._scan_all()
+        entries = [entry for ext in self.API_EXTENSIONS for entry in index.get(ext, ())]
         
-        # API endpoint patterns
-        api_patterns = [
-            r'["\']\/api\/([^"\']+)["\']',
-            r'fetch\(["\']([^"\']+)["\']',
-            r'axios\.[a-z]+\(["\']([^"\']+)["\']',
-        ]
+        endpoints = set()
+        for _, found in self._scan_files(entries, self._extract_endpoints):
+            endpoints.update(found)
         
-        for filepath in self.source_dir.rglob('*.js'):
+        return sorted(endpoints)
+    
+    def _scan_files(
+        self,
+        entries: List[Tuple[str, str]],
+        scan: Callable[[Buffer], T]
+    ) -> List[Tuple[str, T]]:
+        """
+        Read files and scan their contents on a thread pool.
+        
+        File reads release the GIL, so reading many small files in parallel
+        overlaps their I/O. Results are cached per file and reused while the
+        file's mtime and size are unchanged, so re-analysis only reads files
+        that were modified. Files that can't be read or scanned are skipped.
+        
+        Args:
+            entries: (path, relative path) pairs from the file index
+            scan: Function applied to each file's raw content (memory-mapped
+                for files of MMAP_THRESHOLD bytes or more)
+            
+        Returns:
+            (relative path, scan result) pairs, in the order of entries
+        """
+        cache = self._scan_cache
+        scanner = scan.__name__
+        
+        def work(entry: Tuple[str, str]) -> Optional[Tuple[str, T]]:
+            filepath, rel_path = entry
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    for pattern in api_patterns:
-                        matches = re.finditer(pattern, content)
-                        for match in matches:
-                            endpoint = match.group(1)
-                            if endpoint.startswith('/') and endpoint not in endpoints:
-                                endpoints.append(endpoint)
+                st = os.stat(filepath)
+                version = (st.st_mtime_ns, st.st_size)
+                cached = cache.get((scanner, filepath))
+                if cached is not None and cached[0] == version:
+                    return rel_path, cached[1]
+                
+                with open(filepath, 'rb') as f:
+                    if st.st_size < self.MMAP_THRESHOLD:
+                        result = scan(f.read())
+                    else:
+                        # Scan large files in place instead of copying them into memory
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            result = scan(mm)
             except Exception:
-                continue
+                return None
+            
+            cache[(scanner, filepath)] = (version, result)
+            return rel_path, result
         
-        return sorted(endpoints)
+        if len(entries) < 2:
+            results = [work(entry) for entry in entries]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(entries))) as pool:
+                results = list(pool.map(work, entries))
+        
+        return [result for result in results if result is not None]
     
-    def _extract_test_ids_from_content(self, content: str) -> List[str]:
-        """Extract test IDs from file content."""
+    def _scan_all(self) -> FileIndex:
+        """
+        Index the source tree's files by extension.
+        
+        The tree is walked once and the index reused until a directory's
+        mtime changes (a file or subdirectory was added, removed or renamed).
+        Only files with an extension some finder scans are indexed.
+        
+        Returns:
+            Mapping of extension to (path, relative path) pairs
+        """
+        if self._file_index is not None and self._index_is_current():
+            return self._file_index
+        
+        index: FileIndex = {}
+        dir_mtimes: Dict[str, int] = {}
+        for filepath, rel_path, ext in self._iter_source_files(dir_mtimes):
+            index.setdefault(ext, []).append((filepath, rel_path))
+        
+        self._file_index = index
+        self._dir_mtimes = dir_mtimes
+        return index
+    
+    def _iter_source_files(self, dir_mtimes: Dict[str, int]) -> Iterator[Tuple[str, str, str]]:
+        """
+        Walk the source tree with os.scandir, yielding the files of interest.
+        
+        DirEntry carries the file type from the directory listing, so files
+        and directories are told apart without a stat call per entry.
+        Symlinked directories and SKIP_DIRS are not descended into.
+        
+        Args:
+            dir_mtimes: Filled with the mtime of every directory visited
+            
+        Yields:
+            (path, relative path, extension) for files with a scanned extension
+        """
+        stack = [(str(self.source_dir), "")]
+        while stack:
+            path, rel_dir = stack.pop()
+            try:
+                dir_mtimes[path] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                rel_path = rel_dir + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.SKIP_DIRS:
+                        subdirs.append((entry.path, rel_path + os.sep))
+                elif entry.is_file():
+                    ext = os.path.splitext(entry.name)[1]
+                    if ext in self.SCANNED_EXTENSIONS:
+                        yield entry.path, rel_path, ext
+            
+            # Visit subdirectories in listing order, depth first
+            stack.extend(reversed(subdirs))
+    
+    def _index_is_current(self) -> bool:
+        """Whether no indexed directory changed since the index was built."""
+        try:
+            return all(
+                os.stat(path).st_mtime_ns == mtime
+                for path, mtime in self._dir_mtimes.items()
+            )
+        except OSError:
+            return False
+    
+    def _is_component(self, rel_path: str, ext: str) -> bool:
+        """Whether a file is a component, by name or by living under a components directory."""
+        if rel_path.endswith(self.COMPONENT_SUFFIXES):
+            return True
+        if ext not in self.COMPONENT_DIR_EXTENSIONS:
+            return False
+        return self.COMPONENT_DIR in rel_path.split(os.sep)[:-1]
+    
+    def _extract_test_ids_from_content(self, content: Buffer) -> List[str]:
+        """Extract test IDs from raw file content."""
         test_ids = []
-        matches = re.finditer(r'data-testid=["\']([^"\']+)["\']', content)
-        for match in matches:
-            test_ids.append(match.group(1))
+        if not _contains_any(content, _TEST_ID_LITERALS):
+            return test_ids
+        for match in _TEST_ID_RE.finditer(content):
+            test_ids.append(match.group(1).decode('utf-8', 'replace'))
         return test_ids
     
-    def _extract_props(self, content: str) -> List[str]:
-        """Extract component props (simplified)."""
-        props = []
-        # Simple pattern for props in TypeScript/JavaScript
-        matches = re.finditer(r'(\w+)\s*:\s*\w+[,;]', content)
-        for match in matches:
-            prop = match.group(1)
-            if prop not in ['const', 'let', 'var', 'function', 'class']:
-                props.append(prop)
-        return props[:10]  # Limit to avoid noise
+    def _extract_routes(self, content: Buffer) -> List[str]:
+        """Extract route paths from raw file content."""
+        if not _contains_any(content, _ROUTE_LITERALS):
+            return []
+        return [
+            match.group(match.lastindex).decode('utf-8', 'replace')
+            for match in _ROUTE_RE.finditer(content)
+        ]
+    
+    def _extract_endpoints(self, content: Buffer) -> List[str]:
+        """Extract absolute API endpoint paths from raw file content."""
+        endpoints = []
+        if not _contains_any(content, _API_LITERALS):
+            return endpoints
+        for match in _API_RE.finditer(content):
+            endpoint = match.group(match.lastindex).decode('utf-8', 'replace')
+            if endpoint.startswith('/'):
+                endpoints.append(endpoint)
+        return endpoints
+    
+    def _extract_component_info(self, content: Buffer) -> Tuple[List[str], List[str]]:
+        """Extract a component's test IDs and props from raw file content."""
+        return self._extract_test_ids_from_content(content), self._extract_props(content)
+    
+    def _extract_props(self, content: Buffer) -> List[str]:
+        """Extract component props from raw file content (simplified)."""
+        text = str(content, 'utf-8', 'replace')
+        # Stop scanning once enough props were found
+        matches = islice(_PROPS_RE.finditer(text), _MAX_PROPS)
+        return [match.group(1) for match in matches]
+
+
+def _contains_any(content: Buffer, literals: Tuple[bytes, ...]) -> bool:
+    """Whether content contains any of the literals."""
+    # find() rather than `in`, which tests mmap objects for a single byte
+    return any(content.find(literal) != -1 for literal in literals)
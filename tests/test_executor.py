@@ -0,0 +1,449 @@
+"""Tests for test executor."""
+
+import asyncio
+import hashlib
+import http.server
+import json
+import threading
+import pytest
+import tempfile
+from pathlib import Path
+from testTool.executor import TestExecutor
+from testTool.learning_layer import KnowledgeBase
+from testTool.browser_control.playwright_controller import PlaywrightController, _READ_BATCH_JS, content_hash
+from testTool.models.test_script import TestScript, TestStep
+from testTool.models.action import Action, ActionType
+
+
+PAGE = b"<html><h1>Welcome back</h1></html>"
+
+
+@pytest.fixture
+def page_url():
+    """Serve a static page on localhost."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+@pytest.fixture
+def temp_executor():
+    """Create an executor with a temporary knowledge base."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield TestExecutor(
+            screenshots_dir=f"{tmpdir}/screenshots",
+            results_dir=f"{tmpdir}/results",
+            knowledge_base=KnowledgeBase(base_path=f"{tmpdir}/kb")
+        )
+
+
+def _script(url, action):
+    return TestScript(
+        name="skill_test",
+        description="Skill replay",
+        steps=[
+            TestStep(description="Open", action=Action(type=ActionType.NAVIGATE, value=url)),
+            TestStep(description="Read", action=action)
+        ]
+    )
+
+
+def test_skill_replay_without_browser(temp_executor, page_url):
+    """Test that a cached skill answers NAVIGATE + EXTRACT without a browser."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(PAGE))
+    
+    result = temp_executor.execute_sync(
+        _script(page_url, Action(type=ActionType.EXTRACT, selector="h1"))
+    )
+    
+    assert result.success
+    assert [s.metadata.get("skill_replay") for s in result.step_results] == [True, True]
+    assert result.step_results[1].metadata["extracted_text"] == "Welcome back"
+
+
+def test_skill_replay_assert_text(temp_executor, page_url):
+    """Test that ASSERT_TEXT is answered from the cached extraction."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(PAGE))
+    
+    result = temp_executor.execute_sync(
+        _script(page_url, Action(type=ActionType.ASSERT_TEXT, selector="h1", text="Welcome"))
+    )
+    
+    assert result.success
+    assert result.step_results[1].metadata == {"text": "Welcome", "skill_replay": True}
+
+
+@pytest.mark.asyncio
+async def test_skill_replay_rejects_changed_page(temp_executor, page_url):
+    """Test that a skill captured from different page content is not replayed."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(b"old page"))
+    script = _script(page_url, Action(type=ActionType.EXTRACT, selector="h1"))
+    
+    replayed = await temp_executor._replay_skill(0, script.steps[0], script.steps[1])
+    assert replayed is None
+
+
+def test_result_saved(temp_executor, page_url):
+    """Test that execution results are written as JSON."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(PAGE))
+    
+    temp_executor.execute_sync(_script(page_url, Action(type=ActionType.EXTRACT, selector="h1")))
+    
+    saved = list(temp_executor.results_dir.glob("skill_test_*.json"))
+    assert len(saved) == 1
+    data = json.loads(saved[0].read_text())
+    assert data["success"] is True
+    assert len(data["step_results"]) == 2
+    assert "T" in data["executed_at"]
+
+
+class _FakeController:
+    """Browser controller stand-in whose fingerprint names the current page."""
+    
+    fail_navigation = False
+    fail_screenshots = False
+    
+    # Controllers started and not yet stopped, and the most seen at once
+    active = 0
+    peak = 0
+    
+    def __init__(self, screenshots_dir=".", **kwargs):
+        self.url = None
+        self.last_response = None
+        self.screenshots_dir = Path(screenshots_dir)
+        self.screenshot_errors = {}
+    
+    async def start(self):
+        cls = type(self)
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+    
+    async def stop(self):
+        type(self).active -= 1
+    
+    async def execute_action(self, action):
+        # Yield so concurrently executed scripts interleave
+        await asyncio.sleep(0.01)
+        if action.type == ActionType.NAVIGATE:
+            if self.fail_navigation:
+                return {"success": False, "error": "net::ERR_CONNECTION_REFUSED", "duration_ms": 0.0}
+            self.url = action.value
+        return {"success": True, "metadata": {}, "duration_ms": 0.0}
+    
+    async def get_dom_fingerprint(self):
+        return f"page:{self.url}"
+    
+    async def _screenshot(self, name):
+        path = self.screenshots_dir / f"{name}.png"
+        if self.fail_screenshots:
+            self.screenshot_errors[str(path)] = OSError(28, "No space left on device")
+        return path
+    
+    async def flush_screenshots(self):
+        if self.screenshot_errors:
+            raise next(iter(self.screenshot_errors.values()))
+
+
+class _FakePool:
+    """Browser pool stand-in that never launches a browser."""
+    
+    async def get_browser(self, headless=True):
+        return None
+    
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_controller(monkeypatch):
+    """Run the executor against _FakeController instead of Playwright."""
+    monkeypatch.setattr("testTool.executor.test_executor.PlaywrightController", _FakeController)
+    monkeypatch.setattr("testTool.executor.test_executor.get_browser_pool", _FakePool)
+    monkeypatch.setattr(_FakeController, "active", 0)
+    monkeypatch.setattr(_FakeController, "peak", 0)
+    return _FakeController
+
+
+def _replay_then_read_script(page_url):
+    return TestScript(
+        name="skill_test",
+        description="Skill replay followed by a read",
+        steps=[
+            TestStep(description="Open other", action=Action(type=ActionType.NAVIGATE, value="about:blank")),
+            TestStep(description="Open", action=Action(type=ActionType.NAVIGATE, value=page_url)),
+            TestStep(description="Read", action=Action(type=ActionType.EXTRACT, selector="h1")),
+            TestStep(description="Read again", action=Action(type=ActionType.EXTRACT, selector="h2"))
+        ]
+    )
+
+
+def test_read_after_skill_replay_fingerprints_new_page(temp_executor, page_url, fake_controller):
+    """Test that a read-only step after a replay does not reuse the pre-replay snapshot."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(PAGE))
+    
+    result = temp_executor.execute_sync(_replay_then_read_script(page_url))
+    
+    assert result.success
+    assert result.step_results[0].dom_snapshot == "page:about:blank"
+    assert result.step_results[2].metadata["skill_replay"]
+    assert result.step_results[3].dom_snapshot == f"page:{page_url}"
+
+
+def test_failed_deferred_navigation_fails_run(temp_executor, page_url, fake_controller, monkeypatch):
+    """Test that a failed navigation owed after a replay is reported."""
+    temp_executor.knowledge_base.add_skill(page_url, "h1", "Welcome back", content_hash(PAGE))
+    script = _replay_then_read_script(page_url)
+    script.steps = script.steps[1:]
+    monkeypatch.setattr(fake_controller, "fail_navigation", True)
+    
+    result = temp_executor.execute_sync(script)
+    
+    assert not result.success
+    assert not result.step_results[0].success
+    assert result.step_results[0].error == "net::ERR_CONNECTION_REFUSED"
+    assert result.step_results[0].metadata["skill_replay"]
+
+
+@pytest.mark.asyncio
+async def test_secure_dom_snapshot_does_not_retain_content(tmp_path):
+    """Test that the SHA-256 snapshot cache keeps digests, not page content."""
+    class Page:
+        html = "<html>" + "x" * 10_000 + "</html>"
+        
+        async def content(self):
+            return self.html
+    
+    controller = PlaywrightController(screenshots_dir=str(tmp_path))
+    controller.page = Page()
+    expected = hashlib.sha256(Page.html.encode()).hexdigest()
+    
+    assert await controller.get_dom_snapshot(secure=True) == expected
+    assert await controller.get_dom_snapshot(secure=True) == expected
+    assert all(len(value) <= 64 for value in controller._last_dom)
+    
+    controller.page.html = "<html>changed</html>"
+    assert await controller.get_dom_snapshot(secure=True) == hashlib.sha256(b"<html>changed</html>").hexdigest()
+
+
+def test_execute_many_isolates_concurrent_runs(temp_executor, fake_controller):
+    """Test that execute_many keeps input order, the parallelism limit and per-run files."""
+    temp_executor.max_parallel = 2
+    scripts = [
+        TestScript(
+            name="parallel",
+            description="Same-named concurrent scripts",
+            steps=[
+                TestStep(
+                    description=f"Open {i}",
+                    action=Action(type=ActionType.NAVIGATE, value=f"https://example.com/{i}"),
+                    screenshot=True
+                )
+                for i in range(count)
+            ]
+        )
+        for count in (3, 1, 2, 4)
+    ]
+    
+    results = temp_executor.execute_many_sync(scripts)
+    
+    assert [len(result.step_results) for result in results] == [3, 1, 2, 4]
+    assert fake_controller.peak == 2
+    
+    screenshots = [step.screenshot_path for result in results for step in result.step_results]
+    assert len(set(screenshots)) == len(screenshots)
+    assert len(list(temp_executor.results_dir.glob("parallel_*.json"))) == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_screenshot_write_is_raised(tmp_path):
+    """Test that a failed background screenshot write surfaces from flush_screenshots()."""
+    class Page:
+        async def screenshot(self, full_page=False):
+            return b"png"
+    
+    # The screenshots directory can't be created below a regular file
+    (tmp_path / "file").write_text("")
+    controller = PlaywrightController(screenshots_dir=str(tmp_path / "file" / "shots"))
+    controller.page = Page()
+    
+    path = await controller._screenshot("step_0")
+    
+    with pytest.raises(OSError):
+        await controller.flush_screenshots()
+    assert isinstance(controller.screenshot_errors[str(path)], OSError)
+    # Each failure is raised once
+    await controller.flush_screenshots()
+
+
+def test_failed_screenshot_fails_step(temp_executor, fake_controller, monkeypatch):
+    """Test that a step whose screenshot was not saved is reported as failed."""
+    monkeypatch.setattr(fake_controller, "fail_screenshots", True)
+    script = TestScript(
+        name="screenshot_test",
+        description="Screenshot write fails",
+        steps=[
+            TestStep(
+                description="Open",
+                action=Action(type=ActionType.NAVIGATE, value="https://example.com"),
+                screenshot=True
+            )
+        ]
+    )
+    
+    result = temp_executor.execute_sync(script)
+    
+    assert not result.success
+    assert result.step_results[0].error.startswith("Screenshot not saved:")
+
+
+class _FakeLocator:
+    """Locator stand-in that resolves immediately."""
+    
+    def __init__(self, text):
+        self.text = text
+        self.first = self
+    
+    async def inner_text(self, timeout=None):
+        return self.text
+    
+    async def click(self, timeout=None):
+        pass
+    
+    async def wait_for(self, timeout=None):
+        pass
+
+
+class _FakePage:
+    """
+    Page stand-in for PlaywrightController.
+    
+    Selectors in texts can be located; only those in readable are answered
+    by the batched read, as if the others were hidden or not plain CSS.
+    """
+    
+    def __init__(self, texts, readable):
+        self.texts = texts
+        self.readable = readable
+        self.batches = []
+        self.fingerprints = 0
+        self.contents = 0
+    
+    async def evaluate(self, script, arg=None):
+        if script == _READ_BATCH_JS:
+            self.batches.append(arg)
+            return [self.texts[selector] if selector in self.readable else None for selector in arg]
+        self.fingerprints += 1
+        return f"fingerprint:{self.fingerprints}"
+    
+    async def content(self):
+        self.contents += 1
+        return "<html>" + "".join(self.texts.values()) + "</html>"
+    
+    def locator(self, selector):
+        return _FakeLocator(self.texts[selector])
+
+
+class _FakePageController(PlaywrightController):
+    """Real controller logic over a _FakePage instead of a browser."""
+    
+    fake_page = None
+    
+    async def start(self):
+        self.page = self.fake_page
+    
+    async def stop(self):
+        await self.flush_screenshots()
+
+
+@pytest.fixture
+def fake_page(monkeypatch):
+    """Run the executor's controllers against one shared _FakePage."""
+    page = _FakePage(
+        texts={"#title": "Dashboard", "#status": "Loading", "#hidden": "Hidden", "#footer": "(c)"},
+        readable={"#title", "#status", "#footer"}
+    )
+    monkeypatch.setattr(_FakePageController, "fake_page", page)
+    monkeypatch.setattr("testTool.executor.test_executor.PlaywrightController", _FakePageController)
+    monkeypatch.setattr("testTool.executor.test_executor.get_browser_pool", _FakePool)
+    return page
+
+
+def _readonly_script():
+    return TestScript(
+        name="readonly_test",
+        description="Read-only run",
+        steps=[
+            TestStep(description="Title", action=Action(type=ActionType.EXTRACT, selector="#title")),
+            TestStep(description="Status", action=Action(type=ActionType.ASSERT_TEXT, selector="#status", text="Ready")),
+            TestStep(description="Hidden", action=Action(type=ActionType.EXTRACT, selector="#hidden")),
+            TestStep(description="Footer", action=Action(type=ActionType.ASSERT_ELEMENT, selector="#footer"))
+        ]
+    )
+
+
+def test_readonly_run_batches_reads_with_fallback(temp_executor, fake_page):
+    """Test that a read-only run is read in one batch, falling back per step where JS can't answer."""
+    result = temp_executor.execute_sync(_readonly_script())
+    
+    assert fake_page.batches == [["#title", "#status", "#hidden", "#footer"]]
+    steps = result.step_results
+    assert steps[0].metadata == {"extracted_text": "Dashboard"}
+    assert steps[2].success
+    assert steps[2].metadata == {"extracted_text": "Hidden"}
+    assert steps[3].metadata == {"selector": "#footer"}
+
+
+def test_readonly_run_takes_one_snapshot(temp_executor, fake_page):
+    """Test that every step of a read-only run shares a single DOM fingerprint."""
+    result = temp_executor.execute_sync(_readonly_script())
+    
+    assert fake_page.fingerprints == 1
+    assert {step.dom_snapshot for step in result.step_results} == {"fingerprint:1"}
+
+
+def test_readonly_run_assert_text_mismatch(temp_executor, fake_page):
+    """Test that a batched ASSERT_TEXT mismatch fails that step and the run."""
+    result = temp_executor.execute_sync(_readonly_script())
+    
+    assert not result.success
+    assert [step.success for step in result.step_results] == [True, False, True, True]
+    assert result.step_results[1].error == "Expected text 'Ready' not found. Actual: 'Loading'"
+
+
+@pytest.mark.parametrize("verify_dom,fingerprints,contents", [
+    pytest.param(False, 2, 0, id="fingerprint_after_mutations"),
+    pytest.param(True, 0, 3, id="verify_dom"),
+])
+def test_dom_state_read_only_when_needed(temp_executor, fake_page, verify_dom, fingerprints, contents):
+    """Test that only mutating steps fingerprint the DOM, unless every step is verified."""
+    temp_executor.verify_dom = verify_dom
+    script = TestScript(
+        name="gating_test",
+        description="Fingerprint gating",
+        steps=[
+            TestStep(description="Click", action=Action(type=ActionType.CLICK, selector="#title")),
+            TestStep(description="Read", action=Action(type=ActionType.EXTRACT, selector="#hidden")),
+            TestStep(description="Click again", action=Action(type=ActionType.CLICK, selector="#title"))
+        ]
+    )
+    
+    result = temp_executor.execute_sync(script)
+    
+    assert result.success
+    assert fake_page.fingerprints == fingerprints
+    assert fake_page.contents == contents
+    if not verify_dom:
+        # The read-only step carries the click's fingerprint forward
+        assert result.step_results[1].dom_snapshot == result.step_results[0].dom_snapshot
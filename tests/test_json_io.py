@@ -0,0 +1,39 @@
+"""Tests for JSON helpers."""
+
+import pytest
+from datetime import datetime
+from testTool.utils import json_io
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test with orjson (when installed) and the stdlib fallback."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_io, "orjson", None)
+    return request.param
+
+
+def test_round_trip(backend):
+    """Test serializing and deserializing data."""
+    data = {"name": "test", "steps": [1, 2, 3], "nested": {"ok": True}}
+    
+    assert json_io.loads(json_io.dumps(data)) == data
+
+
+def test_compact_by_default(backend, monkeypatch):
+    """Test that output is compact unless indentation is requested."""
+    monkeypatch.delenv("TESTTOOL_JSON_INDENT", raising=False)
+    assert b"\n" not in json_io.dumps({"a": [1, 2]})
+    
+    monkeypatch.setenv("TESTTOOL_JSON_INDENT", "1")
+    assert b"\n" in json_io.dumps({"a": [1, 2]})
+
+
+def test_unsupported_values_stringified(backend):
+    """Test that values like datetimes are serialized as strings."""
+    when = datetime(2024, 1, 2, 3, 4, 5)
+    
+    data = json_io.loads(json_io.dumps({"when": when}))
+    assert data["when"].startswith("2024-01-02")
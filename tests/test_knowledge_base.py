@@ -1,7 +1,11 @@
 """Tests for knowledge base."""
 
+import os
+import subprocess
+import sys
 import pytest
 import tempfile
+from pathlib import Path
 from testTool.learning_layer import KnowledgeBase
 
 
@@ -29,6 +33,16 @@ def test_add_element_mapping(temp_kb):
     assert selector == "button#login"
 
 
+def test_duplicate_selectors_ignored(temp_kb):
+    """Test that a selector is stored once per component."""
+    temp_kb.add_element_mapping("LoginButton", "button#login")
+    temp_kb.add_element_mapping("LoginButton", "#login")
+    temp_kb.add_element_mapping("LoginButton", "button#login")
+    
+    selectors = temp_kb.get_all_mappings()["LoginButton"]["selectors"]
+    assert [s["value"] for s in selectors] == ["button#login", "#login"]
+
+
 def test_add_route(temp_kb):
     """Test adding routes."""
     temp_kb.add_route("/login")
@@ -86,3 +100,98 @@ def test_persistence(temp_kb):
     # Should have the same data
     selector = new_kb.get_selector("TestElement")
     assert selector == "div#test"
+
+
+def test_batched_writes(temp_kb):
+    """Test that mutations inside a batch are written once on exit."""
+    kb_file = temp_kb.base_path / "knowledge_base.log"
+    
+    with temp_kb:
+        for i in range(10):
+            temp_kb.add_route(f"/page/{i}")
+        assert not kb_file.exists()
+    
+    assert kb_file.exists()
+    new_kb = KnowledgeBase(base_path=str(temp_kb.base_path))
+    assert len(new_kb.get_all_routes()) == 10
+
+
+def test_autosave_interval(temp_kb):
+    """Test that debounced writes are persisted by flush()."""
+    kb = KnowledgeBase(base_path=str(temp_kb.base_path), autosave_interval=3600)
+    kb.add_route("/first")
+    kb.add_route("/second")
+    
+    assert KnowledgeBase(base_path=str(kb.base_path)).get_all_routes() == ["/first"]
+    
+    kb.flush()
+    assert KnowledgeBase(base_path=str(kb.base_path)).get_all_routes() == ["/first", "/second"]
+
+
+def test_debounced_writes_flushed_at_exit(temp_kb):
+    """Test that writes still pending when the process exits are persisted."""
+    code = (
+        "import sys\n"
+        "from testTool.learning_layer import KnowledgeBase\n"
+        "kb = KnowledgeBase(base_path=sys.argv[1], autosave_interval=3600)\n"
+        "kb.add_route('/first')\n"
+        "kb.add_route('/second')\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])}
+    subprocess.run([sys.executable, "-c", code, str(temp_kb.base_path)], env=env, check=True)
+    
+    assert KnowledgeBase(base_path=str(temp_kb.base_path)).get_all_routes() == ["/first", "/second"]
+
+
+def test_compact(temp_kb):
+    """Test that compaction folds the journal into a snapshot."""
+    temp_kb.add_route("/login")
+    temp_kb.add_element_mapping("LoginButton", "button#login")
+    assert (temp_kb.base_path / "knowledge_base.log").exists()
+    
+    temp_kb.compact()
+    
+    assert not (temp_kb.base_path / "knowledge_base.log").exists()
+    new_kb = KnowledgeBase(base_path=str(temp_kb.base_path))
+    assert new_kb.get_all_routes() == ["/login"]
+    assert new_kb.get_selector("LoginButton") == "button#login"
+
+
+def test_torn_journal_line(temp_kb):
+    """Test that a partially written journal line is ignored on load."""
+    temp_kb.add_route("/home")
+    with open(temp_kb.base_path / "knowledge_base.log", 'a') as f:
+        f.write('{"op":"add_route","ro')
+    
+    new_kb = KnowledgeBase(base_path=str(temp_kb.base_path))
+    assert new_kb.get_all_routes() == ["/home"]
+
+
+def test_add_skill(temp_kb):
+    """Test caching and reloading skills."""
+    temp_kb.add_skill("https://example.com", "h1", "Welcome", "abc123")
+    
+    new_kb = KnowledgeBase(base_path=str(temp_kb.base_path))
+    assert new_kb.get_skill("https://example.com", "h1") == {
+        "value": "Welcome",
+        "content_hash": "abc123"
+    }
+    assert new_kb.get_skill("https://example.com", "h2") is None
+
+
+def test_bulk_inserts(temp_kb, monkeypatch):
+    """Test that bulk inserts are written with a single journal append."""
+    flushes = []
+    original_flush = temp_kb.flush
+    monkeypatch.setattr(temp_kb, "flush", lambda: (flushes.append(len(temp_kb._pending)), original_flush()))
+    
+    temp_kb.add_element_mappings_bulk(
+        (f"component_{i}", f"[data-testid='component_{i}']", "testid") for i in range(5)
+    )
+    temp_kb.add_routes_bulk(["/", "/login", "/"])
+    
+    assert flushes == [5, 2]
+    
+    new_kb = KnowledgeBase(base_path=str(temp_kb.base_path))
+    assert new_kb.get_selector("component_3") == "[data-testid='component_3']"
+    assert new_kb.get_all_routes() == ["/", "/login"]
@@ -112,3 +112,146 @@ def test_find_similar_workflows(temp_learner):
     similar = temp_learner.find_similar_workflows("user login")
     assert len(similar) > 0
     assert similar[0]["name"] == "login_workflow"
+
+
+def test_batched_observations(temp_learner):
+    """Test that observations inside a batch are written once on exit."""
+    patterns_file = temp_learner.kb_path / "patterns.json"
+    
+    with temp_learner:
+        for i in range(3):
+            temp_learner.observe_script(TestScript(
+                name=f"batch_{i}",
+                description="Batch",
+                steps=[
+                    TestStep(
+                        description="Click",
+                        action=Action(type=ActionType.CLICK, selector="button")
+                    )
+                ]
+            ))
+        assert not patterns_file.exists()
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    assert reloaded.get_common_patterns(min_count=3)[0]["count"] == 3
+
+
+def test_debounced_observations_flushed_at_exit(temp_learner, monkeypatch):
+    """Test that a debounced learner registers its flush to run at exit."""
+    exit_handlers = []
+    monkeypatch.setattr("atexit.register", exit_handlers.append)
+    learner = PatternLearner(knowledge_base_path=str(temp_learner.kb_path), autosave_interval=3600)
+    for i in range(2):
+        learner.observe_script(TestScript(
+            name=f"debounced_{i}",
+            description="Debounced",
+            steps=[
+                TestStep(
+                    description="Click",
+                    action=Action(type=ActionType.CLICK, selector="button")
+                )
+            ]
+        ))
+    
+    assert exit_handlers == [learner.flush]
+    for handler in exit_handlers:
+        handler()
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    assert reloaded.get_common_patterns(min_count=2)[0]["count"] == 2
+
+
+def test_find_similar_workflows_after_reload(temp_learner):
+    """Test that the workflow index is rebuilt when knowledge is reloaded."""
+    steps = [
+        TestStep(description=f"Step {i}", action=Action(type=ActionType.CLICK, selector="button"))
+        for i in range(3)
+    ]
+    temp_learner.observe_script(TestScript(name="checkout_flow", description="Cart checkout", steps=steps))
+    temp_learner.observe_script(TestScript(name="search_flow", description="Product search", steps=steps))
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    
+    similar = reloaded.find_similar_workflows("cart checkout")
+    assert [w["name"] for w in similar] == ["checkout_flow"]
+    assert reloaded.find_similar_workflows("unrelated words") == []
+
+
+def test_observe_scripts_bulk(temp_learner, tmp_path):
+    """Test that bulk observation learns the same as observing one by one."""
+    scripts = [
+        TestScript(
+            name=f"bulk_{i}",
+            description=f"Bulk flow {i % 2}",
+            steps=[
+                TestStep(
+                    description=f"Step {j}",
+                    action=Action(type=ActionType.CLICK if (i + j) % 2 else ActionType.TYPE, selector=f"#s{i % 3}", value="x")
+                )
+                for j in range(2 + i % 3)
+            ]
+        )
+        for i in range(6)
+    ]
+    
+    temp_learner.observe_scripts_bulk(scripts)
+    
+    sequential = PatternLearner(knowledge_base_path=str(tmp_path))
+    for script in scripts:
+        sequential.observe_script(script)
+    
+    assert dict(temp_learner.patterns) == dict(sequential.patterns)
+    assert dict(temp_learner.selector_mappings) == dict(sequential.selector_mappings)
+    assert temp_learner.workflows == sequential.workflows
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    assert dict(reloaded.patterns) == dict(sequential.patterns)
+
+
+def test_duplicate_selectors_after_reload(temp_learner):
+    """Test that selectors learned before a reload are not added twice."""
+    script = TestScript(
+        name="dup",
+        description="Duplicate selectors",
+        steps=[
+            TestStep(description="Click submit", action=Action(type=ActionType.CLICK, selector="#submit")),
+            TestStep(description="Click submit", action=Action(type=ActionType.CLICK, selector="#submit"))
+        ]
+    )
+    temp_learner.observe_script(script)
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    reloaded.observe_script(script)
+    
+    assert reloaded.selector_mappings == {"click:Click submit": ["#submit"]}
+    assert reloaded.patterns["click -> click"]["count"] == 2
+
+
+def test_find_similar_workflows_ignores_punctuation(temp_learner):
+    """Test that punctuation doesn't prevent keyword matches."""
+    steps = [
+        TestStep(description=f"Step {i}", action=Action(type=ActionType.CLICK, selector="button"))
+        for i in range(3)
+    ]
+    temp_learner.observe_script(TestScript(name="password_reset", description="Reset password, via email.", steps=steps))
+    
+    similar = temp_learner.find_similar_workflows("Email: password reset!")
+    assert [w["name"] for w in similar] == ["password_reset"]
+
+
+def test_knowledge_loaded_lazily(temp_learner):
+    """Test that collections are only read and rewritten once used."""
+    steps = [
+        TestStep(description=f"Step {i}", action=Action(type=ActionType.CLICK, selector="button"))
+        for i in range(3)
+    ]
+    temp_learner.observe_script(TestScript(name="checkout_flow", description="Cart checkout", steps=steps))
+    workflows_file = temp_learner.kb_path / "workflows.json"
+    saved = workflows_file.read_bytes()
+    
+    reloaded = PatternLearner(knowledge_base_path=str(temp_learner.kb_path))
+    reloaded.observe_script(TestScript(name="short", description="Short", steps=steps[:1]))
+    
+    assert reloaded._workflows is None
+    assert workflows_file.read_bytes() == saved
+    assert [w["name"] for w in reloaded.find_similar_workflows("cart checkout")] == ["checkout_flow"]
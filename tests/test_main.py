@@ -40,3 +40,36 @@ def test_interpret_command():
     assert result.exit_code == 0
     assert 'Instruction:' in result.output
 
+
+def test_record_steps_non_interactive():
+    """Test recording instructions passed on the command line."""
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, [
+            'record', '--name', 'cli_test', '--description', 'CLI test', '--no-interactive',
+            '--step', 'go to https://example.com', '--step', 'click the login button'
+        ])
+        
+        assert result.exit_code == 0
+        assert 'Total steps: 2' in result.output
+
+
+def test_record_steps_imply_non_interactive():
+    """Test that --step records without prompting and rejects --interactive."""
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, [
+            'record', '--name', 'cli_test', '--description', 'CLI test',
+            '--step', 'go to https://example.com'
+        ])
+        
+        assert result.exit_code == 0
+        assert 'Total steps: 1' in result.output
+        
+        result = runner.invoke(cli, [
+            'record', '--name', 'cli_test', '--description', 'CLI test', '--interactive',
+            '--step', 'go to https://example.com'
+        ])
+        
+        assert result.exit_code == 2
+        assert '--step cannot be combined with --interactive' in result.output
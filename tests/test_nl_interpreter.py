@@ -97,3 +97,135 @@ def test_extract_value():
     
     value = interpreter._extract_value('enter "password123"')
     assert value == "password123"
+
+
+def test_leading_verb_takes_priority():
+    """Test that the leading verb wins over keywords later in the instruction."""
+    interpreter = NLInterpreter(use_llm=False)
+    
+    actions = interpreter.interpret("type 'open sesame' in password")
+    
+    assert actions[0].type == ActionType.TYPE
+    assert actions[0].value == "open sesame"
+    assert actions[0].selector == "input[name='password']"
+
+
+@pytest.mark.asyncio
+async def test_interpret_many_rules():
+    """Test batch interpretation with rules keeps instruction order."""
+    interpreter = NLInterpreter(use_llm=False)
+    
+    results = await interpreter.interpret_many(["go to https://example.com", "take a screenshot"])
+    
+    assert [actions[0].type for actions in results] == [ActionType.NAVIGATE, ActionType.SCREENSHOT]
+
+
+@pytest.mark.asyncio
+async def test_interpret_many_llm_concurrency(monkeypatch):
+    """Test that LLM requests overlap up to the concurrency limit."""
+    import threading
+    
+    interpreter = NLInterpreter(use_llm=False)
+    interpreter.use_llm = True
+    interpreter._client = object()
+    
+    lock = threading.Lock()
+    # Requests only finish once three are in flight together
+    all_in_flight = threading.Barrier(3)
+    active = []
+    peak = []
+    
+    def fake_llm(instruction, context):
+        with lock:
+            active.append(instruction)
+            peak.append(len(active))
+        all_in_flight.wait(timeout=5)
+        with lock:
+            active.remove(instruction)
+        return interpreter._interpret_with_rules(instruction, context)
+    
+    monkeypatch.setattr(interpreter, "_interpret_with_llm", fake_llm)
+    
+    instructions = [f"type 'value {i}' in username" for i in range(6)]
+    results = await interpreter.interpret_many(instructions, max_concurrency=3)
+    
+    assert [actions[0].value for actions in results] == [f"value {i}" for i in range(6)]
+    assert max(peak) == 3
+
+
+def test_interpret_blank_instruction():
+    """Test that blank instructions produce no actions."""
+    interpreter = NLInterpreter(use_llm=False)
+    
+    assert interpreter.interpret("") == []
+    assert interpreter.interpret("   \t") == []
+
+
+@pytest.mark.asyncio
+async def test_interpret_stream_yields_actions_as_they_complete(monkeypatch):
+    """Test that streamed actions are yielded before the response ends."""
+    import threading
+    
+    interpreter = NLInterpreter(use_llm=False)
+    interpreter.use_llm = True
+    interpreter._client = object()
+    
+    chunks = [
+        '{"actions": [{"type": "navigate", ',
+        '"value": "https://example.com"}, {"type": "cli',
+        'ck", "selector": "#login"}',
+        ']}'
+    ]
+    first_seen = threading.Event()
+    
+    def fake_stream(instruction, context):
+        yield chunks[0]
+        yield chunks[1]
+        # Hold the rest back until the completed first action was received
+        assert first_seen.wait(timeout=5)
+        yield from chunks[2:]
+    
+    monkeypatch.setattr(interpreter, "_stream_llm_text", fake_stream)
+    
+    seen = []
+    async for action in interpreter.interpret_stream("log in"):
+        seen.append(action.type)
+        first_seen.set()
+    
+    assert seen == [ActionType.NAVIGATE, ActionType.CLICK]
+
+
+@pytest.mark.asyncio
+async def test_interpret_stream_falls_back_to_rules(monkeypatch):
+    """Test that a failed stream falls back to rule-based interpretation."""
+    interpreter = NLInterpreter(use_llm=False)
+    interpreter.use_llm = True
+    interpreter._client = object()
+    
+    def broken_stream(instruction, context):
+        yield '{"actions": [{"type": "navi'
+        raise ConnectionError("stream dropped")
+    
+    monkeypatch.setattr(interpreter, "_stream_llm_text", broken_stream)
+    
+    actions = [action async for action in interpreter.interpret_stream("go to https://example.com")]
+    
+    assert [action.value for action in actions] == ["https://example.com"]
+
+
+@pytest.mark.asyncio
+async def test_interpret_stream_object_without_actions(monkeypatch):
+    """Test that a complete response without "actions" yields nothing, like interpret()."""
+    interpreter = NLInterpreter(use_llm=False)
+    interpreter.use_llm = True
+    interpreter._client = object()
+    
+    def stream_without_actions(instruction, context):
+        yield '{"explanation": "Nothing {to} do"'
+        yield '}'
+    
+    monkeypatch.setattr(interpreter, "_stream_llm_text", stream_without_actions)
+    
+    actions = [action async for action in interpreter.interpret_stream("go to https://example.com")]
+    
+    assert actions == []
@@ -0,0 +1,116 @@
+"""Tests for the Playwright browser controller."""
+
+import asyncio
+import hashlib
+import pytest
+from testTool.browser_control import playwright_controller
+from testTool.browser_control.playwright_controller import PlaywrightController
+from testTool.models.action import Action, ActionType
+
+
+class _ClickLocator:
+    """Locator stand-in whose click can navigate the page, possibly late."""
+    
+    def __init__(self, page):
+        self.page = page
+        self.first = self
+    
+    async def click(self, timeout=None):
+        if self.page.navigate_after is not None:
+            asyncio.get_running_loop().call_later(
+                self.page.navigate_after, self.page.on_navigated, self.page.main_frame
+            )
+
+
+class _NavigatingPage:
+    """Page stand-in that reports navigations and records load-state waits."""
+    
+    def __init__(self, navigate_after=None):
+        self.navigate_after = navigate_after
+        self.main_frame = object()
+        self.on_navigated = None
+        self.load_waits = []
+    
+    def locator(self, selector):
+        return _ClickLocator(self)
+    
+    async def wait_for_load_state(self, state="load", timeout=None):
+        self.load_waits.append(state)
+
+
+def _controller(tmp_path, page):
+    controller = PlaywrightController(screenshots_dir=str(tmp_path))
+    controller.page = page
+    page.on_navigated = controller._on_frame_navigated
+    return controller
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("navigate_after,expected_waits", [
+    pytest.param(0, ["domcontentloaded"], id="navigation"),
+    pytest.param(PlaywrightController.NAVIGATION_GRACE / 5, ["domcontentloaded"], id="navigation_within_grace"),
+    pytest.param(None, [], id="no_navigation"),
+])
+async def test_click_waits_for_load_only_after_navigation(tmp_path, navigate_after, expected_waits):
+    """Test that a click waits for the page to load only when it started a navigation."""
+    page = _NavigatingPage(navigate_after)
+    controller = _controller(tmp_path, page)
+    
+    result = await controller.execute_action(Action(type=ActionType.CLICK, selector="#go"))
+    
+    assert result["success"]
+    assert page.load_waits == expected_waits
+
+
+def test_every_action_type_has_a_handler(tmp_path):
+    """Test that the dispatch table covers every ActionType, keyed by value."""
+    controller = PlaywrightController(screenshots_dir=str(tmp_path))
+    
+    assert set(controller._dispatch) == {action_type.value for action_type in ActionType}
+    assert all(type(key) is str for key in controller._dispatch)
+
+
+class _ContentPage:
+    """Page stand-in that counts content() calls."""
+    
+    def __init__(self, html):
+        self.html = html
+        self.contents = 0
+    
+    async def content(self):
+        self.contents += 1
+        return self.html
+
+
+@pytest.mark.asyncio
+async def test_secure_dom_snapshot_cache(tmp_path, monkeypatch):
+    """Test that secure snapshots use SHA-256 and only recompute it when the content changed."""
+    secure_hashes = []
+    hash_text = playwright_controller.hash_text
+    
+    def counting_hash_text(text, secure=False):
+        if secure:
+            secure_hashes.append(text)
+        return hash_text(text, secure)
+    
+    monkeypatch.setattr(playwright_controller, "hash_text", counting_hash_text)
+    page = _ContentPage("<html>first</html>")
+    controller = PlaywrightController(screenshots_dir=str(tmp_path))
+    controller.page = page
+    first = hashlib.sha256(b"<html>first</html>").hexdigest()
+    
+    # Cache miss, then a hit for unchanged content
+    assert await controller.get_dom_snapshot(secure=True) == first
+    assert await controller.get_dom_snapshot(secure=True) == first
+    assert page.contents == 2
+    # Without xxhash the fast hash already is the SHA-256 digest
+    assert len(secure_hashes) == (0 if playwright_controller.xxhash is None else 1)
+    
+    # Changed content misses again
+    page.html = "<html>second</html>"
+    assert await controller.get_dom_snapshot(secure=True) == hashlib.sha256(b"<html>second</html>").hexdigest()
+    assert page.contents == 3
+    
+    # Change detection without secure uses the fast hash
+    if playwright_controller.xxhash is not None:
+        assert await controller.get_dom_snapshot() != hashlib.sha256(b"<html>second</html>").hexdigest()
@@ -47,6 +47,19 @@ def test_record_steps():
     assert script.steps[1].action.value == "test"
 
 
+def test_record_step_metadata_leaves_action_unchanged():
+    """Test that step metadata is recorded on a copy of the caller's action."""
+    recorder = TestRecorder()
+    recorder.start_recording("test", "Test")
+    action = Action(type=ActionType.CLICK, selector="button", metadata={"source": "cli"})
+    
+    recorder.record_step(description="Click button", action=action, metadata={"attempt": 1})
+    
+    script = recorder.stop_recording()
+    assert script.steps[0].action.metadata == {"source": "cli", "attempt": 1}
+    assert action.metadata == {"source": "cli"}
+
+
 def test_record_with_metadata():
     """Test recording with metadata."""
     recorder = TestRecorder()
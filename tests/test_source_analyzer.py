@@ -1,112 +1,191 @@
 """Tests for source analyzer."""
 
 import pytest
-import tempfile
+from html.parser import HTMLParser
 from pathlib import Path
+from textwrap import dedent
 from testTool.utils import SourceAnalyzer
+from testTool.utils.source_analyzer import _ROUTE_RE
 
+try:
+    from re import _constants, _parser
+except ImportError:  # Python < 3.11
+    import sre_constants as _constants
+    import sre_parse as _parser
 
-@pytest.fixture
-def temp_source_dir():
-    """Create a temporary source directory with sample files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        source_dir = Path(tmpdir)
-        
-        # Create sample HTML file
-        html_file = source_dir / "index.html"
-        html_file.write_text('''
-            <html>
-                <button data-testid="login-btn">Login</button>
-                <input data-testid="username" />
-            </html>
-        ''')
-        
-        # Create sample JSX file
-        jsx_file = source_dir / "App.jsx"
-        jsx_file.write_text('''
-            function App() {
-                return (
-                    <div data-testid="app-container">
-                        <button data-testid="submit-btn">Submit</button>
-                    </div>
-                );
-            }
-        ''')
+
+# Sample application files, dedented and encoded once at import
+SAMPLES = {
+    # Sample HTML file
+    "index.html": dedent('''\
+        <html>
+            <button data-testid="login-btn">Login</button>
+            <input data-testid="username" />
+        </html>
+    ''').encode(),
+    
+    # Sample JSX file
+    "App.jsx": dedent('''\
+        function App() {
+            return (
+                <div data-testid="app-container">
+                    <button data-testid="submit-btn">Submit</button>
+                </div>
+            );
+        }
+    ''').encode(),
+    
+    # Sample Python file with routes
+    "routes.py": dedent('''\
+        from flask import Flask
+        app = Flask(__name__)
         
-        # Create sample Python file with routes
-        py_file = source_dir / "routes.py"
-        py_file.write_text('''
-            from flask import Flask
-            app = Flask(__name__)
-            
-            @app.route('/login')
-            def login():
-                pass
-            
-            @app.route('/dashboard')
-            def dashboard():
-                pass
-        ''')
+        @app.route('/login')
+        def login():
+            pass
         
-        # Create sample JS file with API calls
-        js_file = source_dir / "api.js"
-        js_file.write_text('''
-            const fetchUsers = () => {
-                return fetch('/api/users');
-            };
-            
-            const fetchData = () => {
-                return fetch('/api/data');
-            };
-        ''')
+        @app.route('/dashboard')
+        def dashboard():
+            pass
+    ''').encode(),
+    
+    # Sample JS file with API calls
+    "api.js": dedent('''\
+        const fetchUsers = () => {
+            return fetch('/api/users');
+        };
         
-        yield source_dir
+        const fetchData = () => {
+            return fetch('/api/data');
+        };
+    ''').encode()
+}
+
+
+class _TidCollector(HTMLParser):
+    """Collect data-testid attribute values with the stdlib HTML parser."""
+    
+    def __init__(self):
+        super().__init__()
+        self.ids = []
+    
+    def handle_starttag(self, tag, attrs):
+        self.ids.extend(value for name, value in attrs if name == "data-testid")
+    
+    handle_startendtag = handle_starttag
+
+
+def _expected_test_ids():
+    """Parse the data-testid values out of the sample files independently of the analyzer."""
+    collector = _TidCollector()
+    for data in SAMPLES.values():
+        collector.feed(data.decode())
+    collector.close()
+    return collector.ids
+
 
+def _write_sample_sources(source_dir):
+    """Write the sample application files into a directory."""
+    for name, data in SAMPLES.items():
+        (source_dir / name).write_bytes(data)
 
-def test_analyzer_creation(temp_source_dir):
+
+@pytest.fixture(scope="session")
+def temp_source_dir(tmp_path_factory):
+    """Create a sample source directory shared by the read-only tests."""
+    source_dir = tmp_path_factory.mktemp("analyzer_src", numbered=False)
+    _write_sample_sources(source_dir)
+    return source_dir
+
+
+@pytest.fixture(scope="module")
+def analyzer(temp_source_dir):
+    """Create an analyzer over the shared sample tree."""
+    return SourceAnalyzer(str(temp_source_dir))
+
+
+@pytest.fixture(scope="module")
+def analysis(analyzer):
+    """Run a full analysis of the shared sample tree once."""
+    return analyzer.analyze()
+
+
+@pytest.fixture
+def mutable_source_dir(tmp_path):
+    """Create a sample source directory for a test that modifies it."""
+    _write_sample_sources(tmp_path)
+    return tmp_path
+
+
+def test_analyzer_creation(analyzer):
     """Test creating a source analyzer."""
-    analyzer = SourceAnalyzer(str(temp_source_dir))
     assert analyzer is not None
 
 
-def test_find_test_ids(temp_source_dir):
+def test_find_test_ids(analyzer):
     """Test finding data-testid attributes."""
-    analyzer = SourceAnalyzer(str(temp_source_dir))
     test_ids = analyzer.find_test_ids()
     
     assert len(test_ids) > 0
     
-    # Check that we found the test IDs
+    # Check that we found exactly the test IDs an HTML parser sees
     ids = [item['id'] for item in test_ids]
-    assert 'login-btn' in ids
-    assert 'username' in ids
-    assert 'submit-btn' in ids
+    assert sorted(ids) == sorted(_expected_test_ids())
+    assert {'login-btn', 'username', 'submit-btn'} <= set(ids)
 
 
-def test_find_routes(temp_source_dir):
+def test_find_routes(analyzer):
     """Test finding application routes."""
-    analyzer = SourceAnalyzer(str(temp_source_dir))
     routes = analyzer.find_routes()
     
     assert len(routes) > 0
-    assert '/login' in routes
-    assert '/dashboard' in routes
+    assert {'/login', '/dashboard'} <= set(routes)
+
+
+def _repeats(items):
+    """Yield the (repeat, nested items) pairs of a parsed regex, recursively."""
+    for op, av in items:
+        if op in (_constants.MAX_REPEAT, _constants.MIN_REPEAT):
+            yield op, av[2]
+            yield from _repeats(av[2])
+        elif op == _constants.SUBPATTERN:
+            yield from _repeats(av[-1])
+        elif op == _constants.BRANCH:
+            for branch in av[1]:
+                yield from _repeats(branch)
+
+
+def test_route_pattern_cannot_backtrack_quadratically():
+    """
+    Test that every route alternative starts with a literal and has no nested quantifiers.
+    
+    A literal start means a scan only attempts a match where one could
+    begin, and without nested quantifiers a failed attempt is linear in
+    the run it covers.
+    """
+    (op, (_, alternatives)), = _parser.parse(_ROUTE_RE.pattern)
+    assert op == _constants.BRANCH
+    
+    for alternative in alternatives:
+        assert alternative[0][0] == _constants.LITERAL
+        for _, nested in _repeats(alternative):
+            assert not list(_repeats(nested))
+    
+    padded = b"x" * 100_000 + b"@app.route('/x')"
+    assert [match.group(match.lastindex) for match in _ROUTE_RE.finditer(padded)] == [b'/x']
 
 
-def test_find_api_endpoints(temp_source_dir):
+def test_find_api_endpoints(analyzer):
     """Test finding API endpoints."""
-    analyzer = SourceAnalyzer(str(temp_source_dir))
     endpoints = analyzer.find_api_endpoints()
     
     assert len(endpoints) > 0
-    assert '/api/users' in endpoints
-    assert '/api/data' in endpoints
+    assert {'/api/users', '/api/data'} <= set(endpoints)
 
 
-def test_analyze_comprehensive(temp_source_dir):
+def test_analyze_comprehensive(analysis):
     """Test comprehensive analysis."""
-    analyzer = SourceAnalyzer(str(temp_source_dir))
-    results = analyzer.analyze()
+    results = analysis
     
     assert 'test_ids' in results
     assert 'routes' in results
@@ -122,3 +201,79 @@ def test_invalid_source_dir():
     """Test error with invalid source directory."""
     with pytest.raises(ValueError):
         SourceAnalyzer("/nonexistent/path")
+
+
+def test_file_index_refreshed_on_change(mutable_source_dir):
+    """Test that the cached file index picks up added files."""
+    analyzer = SourceAnalyzer(str(mutable_source_dir))
+    assert analyzer._scan_all() is analyzer._scan_all()
+    
+    nested = mutable_source_dir / "pages" / "settings"
+    nested.mkdir(parents=True)
+    (nested / "Settings.vue").write_text('<div data-testid="settings"></div>')
+    
+    ids = {entry["id"]: entry["file"] for entry in analyzer.find_test_ids()}
+    assert ids["settings"] == str(Path("pages") / "settings" / "Settings.vue")
+    assert "login-btn" in ids
+
+
+def test_rescan_only_reads_modified_files(mutable_source_dir, monkeypatch):
+    """Test that unchanged files are served from the scan cache."""
+    import builtins
+    
+    analyzer = SourceAnalyzer(str(mutable_source_dir))
+    analyzer.analyze()
+    
+    (mutable_source_dir / "routes.py").write_text("@app.route('/settings')\n")
+    
+    opened = []
+    real_open = builtins.open
+    
+    def tracking_open(file, *args, **kwargs):
+        opened.append(Path(file).name)
+        return real_open(file, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    results = analyzer.analyze()
+    
+    assert opened == ["routes.py"]
+    assert results["routes"] == ["/settings"]
+    assert "login-btn" in [entry["id"] for entry in results["test_ids"]]
+
+
+def test_dependency_directories_skipped(mutable_source_dir):
+    """Test that node_modules and build output are not scanned."""
+    for directory in ("node_modules/lib", "dist"):
+        path = mutable_source_dir / directory
+        path.mkdir(parents=True)
+        (path / "bundle.js").write_text("fetch('/api/vendored');")
+    
+    analyzer = SourceAnalyzer(str(mutable_source_dir))
+    
+    assert analyzer.find_api_endpoints() == ['/api/data', '/api/users']
+
+
+def test_large_files_scanned(mutable_source_dir):
+    """Test that files above the mmap threshold are scanned too."""
+    padding = "<p>filler</p>\n" * (SourceAnalyzer.MMAP_THRESHOLD // 10)
+    (mutable_source_dir / "big.html").write_text(padding + '<div data-testid="footer"></div>')
+    (mutable_source_dir / "big.js").write_text(padding + "fetch('/api/big');")
+    
+    analyzer = SourceAnalyzer(str(mutable_source_dir))
+    
+    assert "footer" in [entry["id"] for entry in analyzer.find_test_ids()]
+    assert "/api/big" in analyzer.find_api_endpoints()
+
+
+def test_component_props_with_non_ascii_names(mutable_source_dir):
+    """Test that props with non-ASCII identifiers are extracted."""
+    components = mutable_source_dir / "components"
+    components.mkdir()
+    (components / "Box.tsx").write_text(
+        "interface BoxProps {\n    größe: number;\n    label: string;\n}\n",
+        encoding="utf-8"
+    )
+    
+    props = SourceAnalyzer(str(mutable_source_dir)).find_components()["Box"]["props"]
+    
+    assert props == ["größe", "label"]
@@ -1,7 +1,6 @@
 """Tests for script storage."""
 
 import pytest
-import tempfile
 from pathlib import Path
 from testTool.recorder import ScriptStorage
 from testTool.models.test_script import TestScript, TestStep
@@ -9,100 +8,263 @@ from testTool.models.action import Action, ActionType
 
 
 @pytest.fixture
-def temp_storage():
+def temp_storage(tmp_path):
     """Create a temporary storage directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield ScriptStorage(storage_dir=tmpdir)
+    return ScriptStorage(storage_dir=str(tmp_path))
 
 
-def test_storage_creation(temp_storage):
+@pytest.fixture
+def memory_storage(request):
+    """Create storage on an in-memory filesystem, or in tmp_path without pyfakefs."""
+    try:
+        from pyfakefs.fake_filesystem_unittest import Patcher
+    except ImportError:
+        yield ScriptStorage(storage_dir=str(request.getfixturevalue("tmp_path")))
+        return
+    
+    with Patcher():
+        yield ScriptStorage(storage_dir="/scripts")
+
+
+@pytest.fixture(scope="session")
+def readonly_storage(tmp_path_factory):
+    """Create one empty storage directory for tests that never write to it."""
+    return ScriptStorage(storage_dir=str(tmp_path_factory.mktemp("storage", numbered=False)))
+
+
+def test_storage_creation(readonly_storage):
     """Test creating storage."""
-    assert temp_storage is not None
-    assert temp_storage.storage_dir.exists()
+    assert readonly_storage is not None
+    assert readonly_storage.storage_dir.exists()
+
+
+@pytest.fixture(scope="module")
+def sample_script_factory():
+    """Build single-step scripts for the round-trip tests."""
+    def make(name, action_type, value=None, selector=None):
+        return TestScript(
+            name=name,
+            description="Test",
+            steps=[
+                TestStep(
+                    description=f"{action_type.value} step",
+                    action=Action(type=action_type, value=value, selector=selector)
+                )
+            ]
+        )
+    return make
 
 
-def test_save_and_load_json(temp_storage):
-    """Test saving and loading JSON scripts."""
+@pytest.mark.parametrize("fmt,action,value,selector", [
+    ("json", ActionType.CLICK, None, "button"),
+    ("yaml", ActionType.NAVIGATE, "https://example.com", None),
+])
+@pytest.mark.parametrize("trusted", [False, True], ids=["validated", "trusted"])
+def test_save_and_load(memory_storage, sample_script_factory, fmt, action, value, selector, trusted):
+    """Test saving and loading scripts in each text format, with and without validation."""
+    if fmt == "yaml":
+        pytest.importorskip("yaml")
+    script = sample_script_factory(f"{fmt}_test", action, value=value, selector=selector)
+    
+    # Save
+    filepath = memory_storage.save(script, format=fmt)
+    assert filepath.exists()
+    
+    # Load
+    loaded = memory_storage.load(f"{fmt}_test", format=fmt, trusted=trusted)
+    assert loaded == script
+    assert loaded.steps[0].action.type == action
+    assert loaded.steps[0].action.value == value
+    assert loaded.steps[0].action.selector == selector
+
+
+def test_save_and_load_msgpack(memory_storage):
+    """Test saving and loading MessagePack scripts."""
+    pytest.importorskip("msgpack")
     script = TestScript(
-        name="test_script",
-        description="Test",
+        name="msgpack_test",
+        description="MessagePack Test",
         steps=[
             TestStep(
-                description="Click",
-                action=Action(type=ActionType.CLICK, selector="button")
+                description="Type",
+                action=Action(type=ActionType.TYPE, selector="#q", value="query")
             )
         ]
     )
     
     # Save
-    filepath = temp_storage.save(script, format='json')
-    assert filepath.exists()
+    filepath = memory_storage.save(script, format='msgpack')
+    assert filepath.suffix == ".msgpack"
     
     # Load
-    loaded = temp_storage.load("test_script", format='json')
-    assert loaded.name == script.name
-    assert len(loaded.steps) == 1
-    assert loaded.steps[0].action.type == ActionType.CLICK
+    loaded = memory_storage.load("msgpack_test", format='msgpack')
+    assert loaded == script
+    assert memory_storage.list_scripts() == ["msgpack_test"]
+    assert memory_storage.delete("msgpack_test")
+    assert not memory_storage.exists("msgpack_test")
 
 
-def test_save_and_load_yaml(temp_storage):
-    """Test saving and loading YAML scripts."""
+def test_save_formats(memory_storage):
+    """Test saving one script in several formats."""
+    pytest.importorskip("yaml")
     script = TestScript(
-        name="yaml_test",
-        description="YAML Test",
+        name="Multi Format",
+        description="Test",
         steps=[
             TestStep(
-                description="Navigate",
-                action=Action(type=ActionType.NAVIGATE, value="https://example.com")
+                description="Click",
+                action=Action(type=ActionType.CLICK, selector="#go")
             )
         ]
     )
     
-    # Save
-    filepath = temp_storage.save(script, format='yaml')
-    assert filepath.exists()
+    paths = memory_storage.save_formats(script, ["json", "yaml"])
     
-    # Load
-    loaded = temp_storage.load("yaml_test", format='yaml')
-    assert loaded.name == script.name
-    assert loaded.steps[0].action.value == "https://example.com"
+    assert [path.name for path in paths] == ["multi_format.json", "multi_format.yaml"]
+    assert memory_storage.load("multi_format", format="json") == script
+    assert memory_storage.load("multi_format", format="yaml") == script
+    assert memory_storage.list_scripts() == ["multi_format"]
+    
+    with pytest.raises(ValueError):
+        memory_storage.save_formats(script, ["json", "xml"])
+
+
+def test_list_metadata(temp_storage):
+    """Test listing script summaries from the metadata index."""
+    pytest.importorskip("yaml")
+    script = TestScript(
+        name="Indexed",
+        description="Indexed script",
+        steps=[
+            TestStep(
+                description="Click",
+                action=Action(type=ActionType.CLICK, selector="#go")
+            )
+        ]
+    )
+    temp_storage.save(script)
+    temp_storage.save(TestScript(name="other", description="Other"), format="yaml")
+    
+    metadata = temp_storage.list_metadata()
+    assert metadata["indexed.json"]["description"] == "Indexed script"
+    assert metadata["indexed.json"]["step_count"] == 1
+    assert metadata["other.yaml"]["format"] == "yaml"
+    assert temp_storage.list_scripts() == ["indexed", "other"]
+    
+    # Files added behind the index's back are parsed and indexed
+    copy = temp_storage.storage_dir / "copied.json"
+    copy.write_bytes((temp_storage.storage_dir / "indexed.json").read_bytes())
+    assert temp_storage.list_metadata()["copied.json"]["name"] == "Indexed"
+    
+    temp_storage.delete("other")
+    assert set(temp_storage.list_metadata()) == {"indexed.json", "copied.json"}
+
+
+def test_save_appends_to_index_journal(temp_storage):
+    """Test that saves and deletes append to the index journal instead of rewriting the index."""
+    temp_storage.save(TestScript(name="first", description="First"))
+    temp_storage.list_metadata()
+    index_file = temp_storage.storage_dir / ScriptStorage.INDEX_FILE
+    journal = temp_storage.storage_dir / ScriptStorage.INDEX_JOURNAL
+    index_bytes = index_file.read_bytes()
+    assert not journal.exists()
+    
+    temp_storage.save(TestScript(name="second", description="Second"))
+    temp_storage.delete("first")
+    
+    assert index_file.read_bytes() == index_bytes
+    assert len(journal.read_bytes().splitlines()) == 4
+    
+    # The journal is folded into the index on listing
+    assert set(temp_storage.list_metadata()) == {"second.json"}
+    assert not journal.exists()
+    assert set(ScriptStorage(str(temp_storage.storage_dir))._read_index()) == {"second.json"}
+
+
+@pytest.mark.parametrize("format", ["json", "yaml"])
+def test_trusted_load_matches_validated(memory_storage, format):
+    """Test that a trusted load builds the same script as a validated one."""
+    if format == "yaml":
+        pytest.importorskip("yaml")
+    script = TestScript(
+        name="trusted",
+        description="Trusted",
+        steps=[
+            TestStep(
+                description="Type",
+                action=Action(type=ActionType.TYPE, selector="#q", value="query"),
+                expected_outcome="Query entered"
+            )
+        ],
+        metadata={"tags": ["smoke"]}
+    )
+    memory_storage.save(script, format=format)
+    
+    loaded = memory_storage.load("trusted", format=format, trusted=True)
+    
+    assert loaded == memory_storage.load("trusted", format=format)
+    assert loaded == script
+    assert loaded.steps[0].action.type == ActionType.TYPE
+
 
+def test_save_many(memory_storage):
+    """Test saving a batch of scripts."""
+    scripts = [TestScript(name=f"Batch {i}", description=f"Script {i}") for i in range(3)]
+    
+    paths = memory_storage.save_many(scripts, fsync=True)
+    
+    assert [path.name for path in paths] == ["batch_0.json", "batch_1.json", "batch_2.json"]
+    assert memory_storage.load("batch_1") == scripts[1]
+    assert set(memory_storage.list_metadata()) == {path.name for path in paths}
 
-def test_list_scripts(temp_storage):
+
+def test_list_scripts(temp_storage, request):
     """Test listing scripts."""
     # Create multiple scripts
-    for i in range(3):
-        script = TestScript(name=f"test_{i}", description="Test")
-        temp_storage.save(script)
+    paths = temp_storage.save_many([
+        TestScript(name=f"{request.node.name}_{i}", description="Test")
+        for i in range(3)
+    ])
+    names = [path.stem for path in paths]
     
     scripts = temp_storage.list_scripts()
     assert len(scripts) >= 3
-    assert "test_0" in scripts
+    assert set(names) <= set(scripts)
 
 
-def test_delete_script(temp_storage):
-    """Test deleting a script."""
-    script = TestScript(name="delete_me", description="Test")
-    temp_storage.save(script)
-    
-    assert temp_storage.exists("delete_me")
-    
-    deleted = temp_storage.delete("delete_me")
-    assert deleted
-    assert not temp_storage.exists("delete_me")
+def _exists_before_save(storage, name):
+    return storage.exists(name)
 
 
-def test_script_not_found(temp_storage):
-    """Test loading non-existent script."""
-    with pytest.raises(FileNotFoundError):
-        temp_storage.load("nonexistent")
+def _exists_after_save(storage, name):
+    return storage.exists(storage.save(TestScript(name=name, description="Test")).stem)
 
 
-def test_exists(temp_storage):
-    """Test checking if script exists."""
-    assert not temp_storage.exists("test")
-    
-    script = TestScript(name="test", description="Test")
-    temp_storage.save(script)
+def _delete_saved(storage, name):
+    name = storage.save(TestScript(name=name, description="Test")).stem
+    deleted = storage.delete(name)
+    assert not storage.exists(name)
+    return deleted
+
+
+def _load_missing(storage, name):
+    return storage.load(name)
+
+
+@pytest.mark.parametrize("op,writes,expected", [
+    pytest.param(_exists_before_save, False, False, id="exists_before_save"),
+    pytest.param(_exists_after_save, True, True, id="exists_after_save"),
+    pytest.param(_delete_saved, True, True, id="delete"),
+    pytest.param(_load_missing, False, FileNotFoundError, id="load_missing"),
+])
+def test_storage_ops(request, op, writes, expected):
+    """Test existence checks, deletion and loading a missing script."""
+    # Only operations that write need a fresh directory
+    storage = request.getfixturevalue("temp_storage" if writes else "readonly_storage")
+    name = f"{request.node.name}_0"
     
-    assert temp_storage.exists("test")
+    if isinstance(expected, type) and issubclass(expected, Exception):
+        with pytest.raises(expected):
+            op(storage, name)
+    else:
+        assert op(storage, name) == expected
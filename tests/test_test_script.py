@@ -2,8 +2,31 @@
 
 import pytest
 from datetime import datetime
+from pydantic import ValidationError
 from testTool.models.test_script import TestScript, TestStep
 from testTool.models.action import Action, ActionType
+from testTool.utils import json_io
+
+
+# Shared step for tests that don't exercise step validation; the action type
+# is stored as its plain value, as use_enum_values would
+_SAMPLE_STEP = TestStep.model_construct(
+    description="Step 1",
+    action=Action.model_construct(type=ActionType.CLICK.value, selector="button")
+)
+
+# Canonical validated sample, shared read-only by the tests below
+_SAMPLE_STEPS = [
+    TestStep(
+        description="Navigate to login",
+        action=Action(type=ActionType.NAVIGATE, value="https://example.com/login")
+    ),
+    TestStep(
+        description="Click login button",
+        action=Action(type=ActionType.CLICK, selector="button#login")
+    )
+]
+_SAMPLE_SCRIPT = TestScript(name="login_test", description="Login test", steps=_SAMPLE_STEPS)
 
 
 def test_test_script_creation():
@@ -23,22 +46,7 @@ def test_test_script_creation():
 
 def test_test_script_with_steps():
     """Test creating a script with steps."""
-    steps = [
-        TestStep(
-            description="Navigate to login",
-            action=Action(type=ActionType.NAVIGATE, value="https://example.com/login")
-        ),
-        TestStep(
-            description="Click login button",
-            action=Action(type=ActionType.CLICK, selector="button#login")
-        )
-    ]
-    
-    script = TestScript(
-        name="login_test",
-        description="Login test",
-        steps=steps
-    )
+    script = _SAMPLE_SCRIPT
     
     assert len(script.steps) == 2
     assert script.steps[0].description == "Navigate to login"
@@ -50,22 +58,34 @@ def test_test_script_serialization():
     script = TestScript(
         name="test",
         description="Test script",
-        steps=[
-            TestStep(
-                description="Step 1",
-                action=Action(type=ActionType.CLICK, selector="button")
-            )
-        ],
+        steps=[_SAMPLE_STEP],
         metadata={"browser": "chromium"}
     )
     
-    data = script.model_dump()
+    raw = script.model_dump_json()
+    data = json_io.loads(raw)
     
     assert data["name"] == "test"
     assert data["metadata"]["browser"] == "chromium"
     assert len(data["steps"]) == 1
     
     # Can recreate
-    new_script = TestScript(**data)
+    new_script = TestScript.model_validate_json(raw)
     assert new_script.name == script.name
     assert len(new_script.steps) == 1
+    assert new_script == script
+
+
+def test_steps_and_actions_are_frozen():
+    """Test that steps and their actions reject attribute assignment."""
+    step = _SAMPLE_SCRIPT.steps[0]
+    
+    with pytest.raises(ValidationError):
+        step.description = "Changed"
+    with pytest.raises(ValidationError):
+        step.action.selector = "#other"
+    
+    # Updated copies are the supported way to change a step
+    changed = step.model_copy(update={"description": "Changed"})
+    assert changed.description == "Changed"
+    assert step.description == "Navigate to login"